@@ -9,6 +9,7 @@ sys.path.append(str(src_path))
 
 from src.agents.document_manager import DocumentManagerAgent
 from src.utils.ocr_processor import OCRProcessor
+from src.storage.results_sink import JSONLResultsSink
 from datetime import datetime
 
 
@@ -89,6 +90,28 @@ def process_test_document(document_path: str, document_type: str):
     
     return result
 
+def process_test_directory(directory: str, document_type: str, processed_dir: str):
+    """Process every image in a directory, streaming results to a JSONL file"""
+    image_extensions = (".jpg", ".jpeg", ".png", ".tif", ".tiff", ".bmp")
+    document_paths = (
+        os.path.join(directory, name)
+        for name in sorted(os.listdir(directory))
+        if name.lower().endswith(image_extensions)
+    )
+    
+    output_path = os.path.join(processed_dir, f"results_{datetime.now():%Y%m%d_%H%M%S}.jsonl")
+    manager = DocumentManagerAgent()
+    with JSONLResultsSink(output_path) as sink:
+        summary = manager.process_batch(document_paths, document_type, sink)
+    
+    print(f"\nProcessed {summary['total']} documents")
+    print(f"Results: {output_path}")
+    print(f"Summary: {sink.summary_path}")
+    for status, count in summary["status_counts"].items():
+        print(f"  {status}: {count}")
+    
+    return summary
+
 def main():
     upload_dir, processed_dir = setup_test_environment()
     
@@ -98,12 +121,25 @@ def main():
     while True:
         print("\nOptions:")
         print("1. Process a new document")
-        print("2. Exit")
+        print("2. Process a directory of documents")
+        print("3. Exit")
         
-        choice = input("\nEnter your choice (1-2): ")
+        choice = input("\nEnter your choice (1-3): ")
         
-        if choice == "2":
+        if choice == "3":
             break
+        elif choice == "2":
+            directory = input("\nEnter the path to the directory: ").strip().strip("'\"")
+            
+            if not os.path.isdir(directory):
+                print("Error: Directory not found!")
+                continue
+            
+            document_type = input("Enter document type (driver_license): ").strip()
+            if not document_type:
+                document_type = "driver_license"  # default for testing
+            
+            process_test_directory(directory, document_type, processed_dir)
         elif choice == "1":
             document_path = input("\nEnter the path to your document (or drag & drop): ").strip()
             # Remove quotes if present (from drag & drop)
@@ -1,6 +1,7 @@
-from typing import Dict, List
+from typing import Dict, List, Iterable
 import logging
 from .license_verifier import LicenseVerifier
+from ..storage.results_sink import JSONLResultsSink
 
 class DocumentManagerAgent:
     def __init__(self):
@@ -33,4 +34,20 @@ class DocumentManagerAgent:
             
         except Exception as e:
             self.logger.error(f"Error processing document: {str(e)}")
-            return {"status": "error", "reason": str(e)}
\ No newline at end of file
+            return {"status": "error", "reason": str(e)}
+    
+    def process_batch(self, document_paths: Iterable[str], document_type: str, sink: JSONLResultsSink) -> Dict:
+        """
+        Process documents one at a time, streaming each result to a sink
+        
+        Args:
+            document_paths: Paths of the documents to process (any iterable, consumed lazily)
+            document_type: Type of document, applied to every path
+            sink: Results sink that receives one record per document
+            
+        Returns:
+            Summary of the run
+        """
+        for document_path in document_paths:
+            sink.write(self.process_document(document_path, document_type), document_path)
+        return sink.summary.to_dict()
@@ -1,45 +1,279 @@
+import atexit
+import fcntl
 import json
+import math
 import os
-from typing import Dict, Any
+import time
+import weakref
+from bisect import bisect_left, insort
+from typing import Dict, Any, List, Tuple, Optional
+
+from ..config.settings import Settings
+from ..storage.pipeline_snapshot import attach_snapshot
+
+SNAPSHOT_VERSION = 2
+
+# Live managers, flushed once at interpreter exit without keeping them alive
+_managers: "weakref.WeakSet[LearningManager]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    for manager in list(_managers):
+        manager.flush()
+
 
 class LearningManager:
-    def __init__(self, model_path: str = "models/learning_patterns.json"):
+    """
+    Time-decayed success/failure scores per field and extraction pattern.
+
+    Scores decay with a configurable half-life so recent traffic outweighs old
+    traffic. Internally every score is kept relative to a fixed epoch, which
+    means decay never reorders patterns: a pattern's rank only changes when it
+    is updated, so each field keeps a sorted ranking that is maintained with
+    bisect instead of re-sorting on every read.
+
+    Updates are persisted as compacted snapshots every `snapshot_every`
+    updates or `snapshot_interval` seconds rather than on every call. Several
+    worker processes can share one model file: each save merges this
+    process's updates since its last save into the scores on disk, under a
+    lock, and then picks up what the other workers saved.
+    """
+
+    def __init__(self, model_path: str = "models/learning_patterns.json",
+                 half_life_days: Optional[float] = None,
+                 snapshot_every: Optional[int] = None,
+                 snapshot_interval: Optional[float] = None):
         self.model_path = model_path
-        self.pattern_stats: Dict[str, Dict[str, int]] = self._load_patterns()
+        self.half_life = (half_life_days if half_life_days is not None else Settings.LEARNING_HALF_LIFE_DAYS) * 86400
+        self.snapshot_every = snapshot_every if snapshot_every is not None else Settings.LEARNING_SNAPSHOT_EVERY
+        self.snapshot_interval = snapshot_interval if snapshot_interval is not None else Settings.LEARNING_SNAPSHOT_INTERVAL
+        self.prune_min_evidence = Settings.LEARNING_PRUNE_MIN_EVIDENCE
+        self.prune_ratio = Settings.LEARNING_PRUNE_RATIO
+
+        # Scores are [success, failure] scaled to self._epoch
+        self._epoch = time.time()
+        self.scores: Dict[str, Dict[str, List[float]]] = {}
+        self._rankings: Dict[str, List[Tuple[float, float, str]]] = {}
+        # This process's updates since the last save, on the same scale as scores
+        self._deltas: Dict[str, Dict[str, List[float]]] = {}
+        self._pending_updates = 0
+        self._last_snapshot = time.time()
+
+        # Start from the shared pipeline snapshot when one was built for this model
+        # and the model file has not been updated since
+        snapshot = attach_snapshot()
+        state = snapshot.learning_state(model_path) if snapshot else None
+        if state and (not os.path.exists(model_path) or os.path.getmtime(model_path) <= state["updated_at"]):
+            self.load_state(state)
+        else:
+            self._load_patterns()
+        _managers.add(self)
+
+    def _load_patterns(self):
+        if not os.path.exists(self.model_path):
+            return
+        with open(self.model_path, "r") as f:
+            data = json.load(f)
+        self.load_state(data)
+
+    def load_state(self, data: Dict[str, Any]):
+        """Replace the current scores with a snapshot (or a legacy counter dict)"""
+        self.scores = self._decayed_scores(data)
+        self._rescale_deltas(self._decay_factor(time.time() - self._epoch))
+        self._epoch = time.time()
+        self._rebuild_rankings()
+
+    def _decayed_scores(self, data: Dict[str, Any]) -> Dict[str, Dict[str, List[float]]]:
+        """Scores of a snapshot (or a legacy counter dict) as of now"""
+        if data.get("version") == SNAPSHOT_VERSION:
+            # Decay the snapshot from the time it was taken to now
+            factor = self._decay_factor(time.time() - data["updated_at"])
+            return {
+                field: {pattern: [s["success"] * factor, s["failure"] * factor] for pattern, s in patterns.items()}
+                for field, patterns in data["fields"].items()
+            }
+        # Legacy format: raw success counters per field and pattern
+        return {
+            field: {pattern: [float(count), 0.0] for pattern, count in patterns.items()}
+            for field, patterns in data.items()
+        }
+
+    def _rescale_deltas(self, factor: float):
+        for patterns in self._deltas.values():
+            for delta in patterns.values():
+                delta[0] *= factor
+                delta[1] *= factor
+
+    def _decay_factor(self, elapsed: float) -> float:
+        return math.pow(2.0, -elapsed / self.half_life)
 
-    def _load_patterns(self) -> Dict[str, Dict[str, int]]:
-        if os.path.exists(self.model_path):
-            with open(self.model_path, "r") as f:
-                return json.load(f)
-        return {}
+    def _weight(self) -> float:
+        """Weight of an update made now, relative to the epoch"""
+        elapsed = time.time() - self._epoch
+        if elapsed > 64 * self.half_life:
+            # Rebase before weights grow large enough to lose float precision
+            self._rebase()
+            elapsed = 0.0
+        return math.pow(2.0, elapsed / self.half_life)
+
+    def _rebase(self):
+        factor = self._decay_factor(time.time() - self._epoch)
+        for patterns in self.scores.values():
+            for score in patterns.values():
+                score[0] *= factor
+                score[1] *= factor
+        self._rescale_deltas(factor)
+        self._epoch = time.time()
+        self._rebuild_rankings()
+
+    @staticmethod
+    def _rank_key(pattern: str, score: List[float]) -> Tuple[float, float, str]:
+        # Ascending sort puts the highest success rate first; unseen patterns rate 0.5.
+        # Both components are scale-invariant in their ordering, so decay keeps them valid.
+        success, failure = score
+        total = success + failure
+        rate = success / total if total > 0 else 0.5
+        return (-rate, -success, pattern)
+
+    def _rebuild_rankings(self):
+        self._rankings = {
+            field: sorted(self._rank_key(pattern, score) for pattern, score in patterns.items())
+            for field, patterns in self.scores.items()
+        }
+
+    def _update(self, field: str, pattern: str, success: float = 0.0, failure: float = 0.0):
+        weight = self._weight()
+        patterns = self.scores.setdefault(field, {})
+        ranking = self._rankings.setdefault(field, [])
+        score = patterns.get(pattern)
+        if score is None:
+            score = patterns[pattern] = [0.0, 0.0]
+        else:
+            old_key = self._rank_key(pattern, score)
+            del ranking[bisect_left(ranking, old_key)]
+        score[0] += success * weight
+        score[1] += failure * weight
+        insort(ranking, self._rank_key(pattern, score))
+        delta = self._deltas.setdefault(field, {}).setdefault(pattern, [0.0, 0.0])
+        delta[0] += success * weight
+        delta[1] += failure * weight
+
+        self._pending_updates += 1
+        if (self._pending_updates >= self.snapshot_every or
+                time.time() - self._last_snapshot >= self.snapshot_interval):
+            self._save_patterns()
 
     def record_success(self, field: str, pattern: str):
-        if field not in self.pattern_stats:
-            self.pattern_stats[field] = {}
-        if pattern not in self.pattern_stats[field]:
-            self.pattern_stats[field][pattern] = 0
-        self.pattern_stats[field][pattern] += 1
-        self._save_patterns()
-
-    def get_top_patterns(self, field: str, top_n: int = 3):
-        if field not in self.pattern_stats:
-            return []
-        sorted_patterns = sorted(self.pattern_stats[field].items(), key=lambda x: x[1], reverse=True)
-        return [p[0] for p in sorted_patterns[:top_n]]
+        self._update(field, pattern, success=1.0)
+
+    def record_failure(self, field: str, pattern: str):
+        self._update(field, pattern, failure=1.0)
 
     def record_feedback(self, field: str, pattern: str, correct: bool):
-        if field not in self.pattern_stats:
-            self.pattern_stats[field] = {}
-        if pattern not in self.pattern_stats[field]:
-            self.pattern_stats[field][pattern] = 0
-        # Positive feedback increases, negative decreases (but not below zero)
         if correct:
-            self.pattern_stats[field][pattern] += 1
+            self.record_success(field, pattern)
         else:
-            self.pattern_stats[field][pattern] = max(0, self.pattern_stats[field][pattern] - 1)
-        self._save_patterns()
+            self.record_failure(field, pattern)
+
+    def get_score(self, field: str, pattern: str) -> Dict[str, float]:
+        """Current decayed success and failure scores for a pattern"""
+        success, failure = self.scores.get(field, {}).get(pattern, (0.0, 0.0))
+        factor = self._decay_factor(time.time() - self._epoch)
+        return {"success": success * factor, "failure": failure * factor}
+
+    def get_top_patterns(self, field: str, top_n: int = 3) -> List[str]:
+        return [key[2] for key in self._rankings.get(field, [])[:top_n]]
+
+    def _is_pruned(self, score: List[float], factor: float) -> bool:
+        success, failure = score
+        evidence = (success + failure) * factor
+        return evidence >= self.prune_min_evidence and success / (success + failure) < self.prune_ratio
+
+    def order_patterns(self, field: str, patterns: List[str]) -> List[str]:
+        """
+        Order candidate patterns best first and drop chronically failing ones
+
+        The order is read off the field's maintained ranking, so no sorting
+        happens per call. Patterns without history rank between good and bad
+        ones, in the order given. Pruned patterns recover on their own once
+        their scores decay below the evidence threshold, and at least one
+        pattern is always returned.
+        """
+        field_scores = self.scores.get(field)
+        if not field_scores:
+            return list(patterns)
+        ranking = self._rankings[field]
+        candidates = set(patterns)
+        # Unseen patterns rate 0.5 with no successes; seen ones ranking above that go first
+        split = bisect_left(ranking, (-0.5, -0.0))
+        ahead = [key[2] for key in ranking[:split] if key[2] in candidates]
+        behind = [key[2] for key in ranking[split:] if key[2] in candidates]
+        ordered = ahead + [p for p in patterns if p not in field_scores] + behind
+        factor = self._decay_factor(time.time() - self._epoch)
+        kept = [p for p in ordered if p not in field_scores or not self._is_pruned(field_scores[p], factor)]
+        return kept or ordered[:1]
+
+    def export_state(self, compact_below: float = 0.01) -> Dict[str, Any]:
+        """
+        Snapshot of the current decayed scores
+
+        Patterns whose decayed evidence fell below `compact_below` are left out.
+        """
+        factor = self._decay_factor(time.time() - self._epoch)
+        return self._snapshot(self.scores, factor, compact_below)
+
+    def _snapshot(self, scores: Dict[str, Dict[str, List[float]]], factor: float = 1.0,
+                  compact_below: float = 0.01) -> Dict[str, Any]:
+        fields = {}
+        for field, patterns in scores.items():
+            kept = {
+                pattern: {"success": success * factor, "failure": failure * factor}
+                for pattern, (success, failure) in patterns.items()
+                if (success + failure) * factor >= compact_below
+            }
+            if kept:
+                fields[field] = kept
+        return {
+            "version": SNAPSHOT_VERSION,
+            "updated_at": time.time(),
+            "half_life_days": self.half_life / 86400,
+            "fields": fields
+        }
+
+    def flush(self):
+        """Write a snapshot if there are unsaved updates"""
+        if self._pending_updates:
+            self._save_patterns()
 
     def _save_patterns(self):
-        os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-        with open(self.model_path, "w") as f:
-            json.dump(self.pattern_stats, f, indent=2)
+        directory = os.path.dirname(self.model_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Other workers may have saved since this one loaded: merge this process's
+        # updates into the file's scores rather than overwriting them
+        with open(f"{self.model_path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                merged = {}
+                if os.path.exists(self.model_path):
+                    with open(self.model_path, "r") as f:
+                        merged = self._decayed_scores(json.load(f))
+                factor = self._decay_factor(time.time() - self._epoch)
+                for field, patterns in self._deltas.items():
+                    for pattern, (success, failure) in patterns.items():
+                        score = merged.setdefault(field, {}).setdefault(pattern, [0.0, 0.0])
+                        score[0] += success * factor
+                        score[1] += failure * factor
+                state = self._snapshot(merged)
+                # Write to a temporary file and swap it in so readers never see a partial snapshot
+                tmp_path = f"{self.model_path}.tmp.{os.getpid()}"
+                with open(tmp_path, "w") as f:
+                    json.dump(state, f, indent=2)
+                os.replace(tmp_path, self.model_path)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        self._deltas = {}
+        self.load_state(state)
+        self._pending_updates = 0
+        self._last_snapshot = time.time()
@@ -2,25 +2,41 @@ from datetime import datetime
 from typing import Dict, Optional
 from ..utils.ocr_processor import OCRProcessor
 from ..config.settings import Settings
+from ..storage.driver_registry import DriverRegistry, load_registry
+from ..storage.pipeline_snapshot import attach_snapshot
 import re
 import logging
 
 class LicenseVerifier:
-    def __init__(self):
+    def __init__(self, registry: Optional[DriverRegistry] = None):
         self.ocr = OCRProcessor()
         self.logger = logging.getLogger(__name__)
         self.requirements = Settings.get_license_requirements()
+        # Optional cross-check against the known-driver registry, prebuilt in the
+        # pipeline snapshot when one is attached
+        if registry is None and Settings.DRIVER_REGISTRY_PATH:
+            snapshot = attach_snapshot()
+            registry = snapshot.registry() if snapshot else None
+            if registry is None:
+                registry = load_registry(Settings.DRIVER_REGISTRY_PATH)
+        self.registry = registry
 
-    def verify_license(self, document_path: str) -> Dict:
+    def verify_license(self, document_path: str, incremental: Optional[bool] = None) -> Dict:
         """
         Verify a driver's license document
         
         Args:
             document_path: Path to the license document
+            incremental: Stop at the first decisive field check (default: Settings.INCREMENTAL_VERIFICATION)
             
         Returns:
             Dict containing verification results
         """
+        if incremental is None:
+            incremental = Settings.INCREMENTAL_VERIFICATION
+        if incremental:
+            return self.verify_license_incremental(document_path)
+        
         # Extract text from license
         ocr_result = self.ocr.extract_text(document_path)
         
@@ -57,7 +73,8 @@ class LicenseVerifier:
             return {
                 "status": "rejected",
                 "reason": f"Could not extract required fields: {', '.join(failed_fields)}",
-                "extracted_info": extracted_info
+                "extracted_info": extracted_info,
+                "confidence": ocr_result["confidence"]
             }
 
         if low_confidence_fields:
@@ -65,27 +82,107 @@ class LicenseVerifier:
                 "status": "rejected",
                 "reason": f"Low confidence in fields: {', '.join(low_confidence_fields)}",
                 "extracted_info": extracted_info,
-                "needs_better_image": True
+                "needs_better_image": True,
+                "confidence": ocr_result["confidence"]
             }
 
         # Validate the extracted information
         validation_result = self._validate_license_info(extracted_info)
         if validation_result["status"] == "rejected":
-            return {**validation_result, "extracted_info": extracted_info}
+            return {**validation_result, "extracted_info": extracted_info, "confidence": ocr_result["confidence"]}
 
-        return {
+        result = {
             "status": "pending_review",
             "needs_human_review": True,
             "reason": "Valid information extracted, awaiting human verification",
             "extracted_info": extracted_info,
             "confidence": ocr_result["confidence"]
         }
+        if "registry_match" in validation_result:
+            result["registry_match"] = validation_result["registry_match"]
+        return result
 
-    def _validate_license_info(self, info: Dict[str, str]) -> Dict:
-        """Validate the extracted license information"""
-        # Check expiration
+    def verify_license_incremental(self, document_path: str) -> Dict:
+        """
+        Verify a driver's license, stopping as soon as the outcome is decided
+        
+        Fields are extracted one at a time, cheapest and most decisive first
+        (expiry date, then license class), and each is checked as soon as it
+        is available. Expired licenses or disallowed classes are rejected
+        without extracting the remaining fields, and the second full-page OCR
+        pass that extract_text makes for plain text is skipped entirely.
+        
+        Args:
+            document_path: Path to the license document
+            
+        Returns:
+            Dict containing verification results; rejections list the fields
+            that were never extracted under "skipped_fields"
+        """
+        ocr_result = self.ocr.extract_words(document_path)
+        
+        if ocr_result["status"] != "success":
+            return {
+                "status": "rejected",
+                "reason": "Failed to extract text from document",
+                "error": ocr_result.get("error")
+            }
+        
+        order = ["expiry_date", "license_class"] + [
+            field for field in self.requirements["required_fields"] if field != "expiry_date"
+        ]
+        extracted_info = {}
+        fields = self.ocr.iter_key_fields(ocr_result["lines"], ocr_result["words"], order,
+                                      image=document_path)
+        for position, (field, field_result) in enumerate(fields):
+            rejection = self._check_field(field, field_result)
+            if field_result["value"]:
+                extracted_info[field] = field_result["value"]
+            if rejection:
+                # Stop pulling from the generator; later fields can't change the outcome
+                fields.close()
+                return {**rejection, "extracted_info": extracted_info, "skipped_fields": order[position + 1:],
+                        "confidence": ocr_result["confidence"]}
+        
+        registry_result = self._check_registry(extracted_info)
+        if registry_result["status"] == "rejected":
+            return {**registry_result, "extracted_info": extracted_info, "confidence": ocr_result["confidence"]}
+        
+        result = {
+            "status": "pending_review",
+            "needs_human_review": True,
+            "reason": "Valid information extracted, awaiting human verification",
+            "extracted_info": extracted_info,
+            "confidence": ocr_result["confidence"]
+        }
+        if "registry_match" in registry_result:
+            result["registry_match"] = registry_result["registry_match"]
+        return result
+
+    def _check_field(self, field: str, field_result: Dict) -> Optional[Dict]:
+        """Check a single extracted field, returning a rejection or None"""
+        if field in self.requirements["required_fields"]:
+            if not field_result["value"]:
+                return {
+                    "status": "rejected",
+                    "reason": f"Could not extract required fields: {field}"
+                }
+            if field_result["confidence"] < self.requirements["field_confidence_thresholds"][field]:
+                return {
+                    "status": "rejected",
+                    "reason": f"Low confidence in fields: {field} ({field_result['confidence']:.1f}%)",
+                    "needs_better_image": True
+                }
+        if field == "expiry_date":
+            return self._check_expiry(field_result["value"])
+        if field == "license_class" and field_result["value"]:
+            return self._check_license_class(field_result["value"])
+        return None
+
+    def _check_expiry(self, value: str) -> Optional[Dict]:
+        """Reject expired licenses and unparseable expiry dates"""
         try:
-            expiry_date = datetime.strptime(info["expiry_date"], "%d-%m-%Y")
+            expiry_date = datetime.strptime(value, "%d-%m-%Y")
             if expiry_date < datetime.now():
                 return {
                     "status": "rejected",
@@ -96,13 +193,46 @@ class LicenseVerifier:
                 "status": "rejected",
                 "reason": "Invalid expiry date format"
             }
+        return None
+
+    def _check_license_class(self, value: str) -> Optional[Dict]:
+        """Reject license classes not acceptable for ride sharing"""
+        if value not in self.requirements["acceptable_classes"]:
+            return {
+                "status": "rejected",
+                "reason": f"License class {value} not acceptable for ride sharing"
+            }
+        return None
+
+    def _check_registry(self, info: Dict[str, str]) -> Dict:
+        """Cross-check against the known-driver registry if one is configured"""
+        if self.registry is None:
+            return {"status": "success"}
+        registry_result = self.registry.verify(info["license_number"], info["name"])
+        if registry_result["status"] == "not_found":
+            return {
+                "status": "rejected",
+                "reason": "License number not found in driver registry"
+            }
+        if registry_result["status"] == "name_mismatch":
+            return {
+                "status": "rejected",
+                "reason": "Name does not match driver registry record",
+                "registry_match": registry_result
+            }
+        return {"status": "success", "registry_match": registry_result}
+
+    def _validate_license_info(self, info: Dict[str, str]) -> Dict:
+        """Validate the extracted license information"""
+        # Check expiration
+        rejection = self._check_expiry(info["expiry_date"])
+        if rejection:
+            return rejection
 
         # Validate license class if present
         if "license_class" in info and info["license_class"]:
-            if info["license_class"] not in self.requirements["acceptable_classes"]:
-                return {
-                    "status": "rejected",
-                    "reason": f"License class {info['license_class']} not acceptable for ride sharing"
-                }
+            rejection = self._check_license_class(info["license_class"])
+            if rejection:
+                return rejection
 
-        return {"status": "success"}
\ No newline at end of file
+        return self._check_registry(info)
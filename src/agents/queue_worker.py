@@ -0,0 +1,83 @@
+import logging
+import os
+import socket
+import time
+from typing import Dict, Optional
+
+from .document_manager import DocumentManagerAgent
+from ..storage.job_queue import JobQueue, SQLiteJobQueue
+
+
+class QueueWorker:
+    """
+    Pulls jobs from a JobQueue and runs them through DocumentManagerAgent.
+
+    Start one worker per process; any number of processes or nodes can share
+    the same queue.
+    """
+
+    def __init__(self, queue: Optional[JobQueue] = None,
+                 manager: Optional[DocumentManagerAgent] = None,
+                 worker_id: Optional[str] = None,
+                 batch_size: int = 1):
+        self.logger = logging.getLogger(__name__)
+        self.queue = queue or SQLiteJobQueue()
+        self.manager = manager or DocumentManagerAgent()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.batch_size = batch_size
+
+    def process_job(self, job: Dict) -> str:
+        """
+        Process a single leased job and report the outcome to the queue
+
+        Returns:
+            'done' if the result was stored, otherwise the state returned by the queue
+        """
+        try:
+            result = self.manager.process_document(job["document_path"], job["document_type"])
+        except Exception as e:
+            result = {"status": "error", "reason": str(e)}
+
+        # Processing errors and OCR/IO failures (reported as a rejection carrying an
+        # "error") may be transient and are retried; other rejections are final results
+        if result.get("status") == "error" or result.get("error"):
+            error = result.get("error") or result.get("reason", "unknown error")
+            state = self.queue.fail(job, str(error))
+            self.logger.warning(f"Job {job['id']} failed on attempt {job['attempts']}, now {state}")
+            return state
+
+        self.queue.complete(job, result)
+        return "done"
+
+    def run_once(self) -> int:
+        """Lease and process one batch of jobs. Returns the number of jobs leased."""
+        jobs = self.queue.lease(self.worker_id, limit=self.batch_size)
+        for job in jobs:
+            self.process_job(job)
+        return len(jobs)
+
+    def run(self, max_jobs: Optional[int] = None, idle_sleep: float = 1.0, stop_when_empty: bool = False):
+        """
+        Keep processing jobs until stopped
+
+        Args:
+            max_jobs: Stop after this many jobs have been leased
+            idle_sleep: Seconds to wait when the queue has no ready jobs
+            stop_when_empty: Return instead of sleeping when no jobs are ready
+        """
+        processed = 0
+        self.logger.info(f"Worker {self.worker_id} started")
+        while max_jobs is None or processed < max_jobs:
+            leased = self.run_once()
+            processed += leased
+            if not leased:
+                if stop_when_empty:
+                    break
+                time.sleep(idle_sleep)
+        self.logger.info(f"Worker {self.worker_id} stopped after {processed} jobs")
+        return processed
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    QueueWorker().run()
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Tuple
 import os
 from dotenv import load_dotenv
 
@@ -9,6 +9,45 @@ class Settings:
     # OCR Configuration
     OCR_CONFIDENCE_THRESHOLD = float(os.getenv('OCR_CONFIDENCE_THRESHOLD', '85.0'))
     
+    # Tesseract configuration profiles. Named profiles override the 'default'
+    # profile; document types and field regions pick a profile by name.
+    OCR_PROFILES = {
+        'default': {
+            'lang': os.getenv('OCR_LANG', 'eng'),
+            'oem': 3,              # Default engine (LSTM when available)
+            'psm': 3,              # Fully automatic page segmentation
+            'whitelist': None,     # No character restriction
+            'dpi': int(os.getenv('OCR_DPI', '300')),
+            'disable_dictionaries': False
+        },
+        'driver_license': {},
+        # Field regions hold a single line of restricted text
+        'license_number': {
+            'psm': 7,
+            'whitelist': 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-',
+            'disable_dictionaries': True
+        },
+        'expiry_date': {
+            'psm': 7,
+            'whitelist': '0123456789-/',
+            'disable_dictionaries': True
+        },
+        'license_class': {
+            'psm': 7,
+            'whitelist': 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789',
+            'disable_dictionaries': True
+        },
+        'name': {
+            'psm': 7,
+            'whitelist': 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.',
+        }
+    }
+    
+    # Profile used for the full-page pass of each document type
+    OCR_DOCUMENT_PROFILES = {
+        'driver_license': 'driver_license'
+    }
+    
     # Field-specific confidence thresholds
     FIELD_CONFIDENCE_THRESHOLDS = {
         'license_number': 70.0,  # Lowered due to complex format with spaces and special chars
@@ -19,14 +58,65 @@ class Settings:
     
     # Document Verification Settings
     REQUIRED_LICENSE_FIELDS = ['license_number', 'expiry_date', 'name']
+    # Check fields as they are extracted and stop at the first rejection
+    INCREMENTAL_VERIFICATION = os.getenv('INCREMENTAL_VERIFICATION', 'False').lower() == 'true'
     LICENSE_CLASS_REQUIREMENTS = {
         'ride_sharing': ['A', 'B', 'C', 'LMV', 'MCWG']  # Added more valid classes
     }
     
+    # Pattern learning: scores halve every LEARNING_HALF_LIFE_DAYS and are snapshotted
+    # to disk every LEARNING_SNAPSHOT_EVERY updates or LEARNING_SNAPSHOT_INTERVAL seconds
+    LEARNING_HALF_LIFE_DAYS = float(os.getenv('LEARNING_HALF_LIFE_DAYS', '30'))
+    LEARNING_SNAPSHOT_EVERY = int(os.getenv('LEARNING_SNAPSHOT_EVERY', '100'))
+    LEARNING_SNAPSHOT_INTERVAL = float(os.getenv('LEARNING_SNAPSHOT_INTERVAL', '300'))
+    # Patterns with at least this much decayed evidence and a success rate below the ratio are skipped
+    LEARNING_PRUNE_MIN_EVIDENCE = float(os.getenv('LEARNING_PRUNE_MIN_EVIDENCE', '20'))
+    LEARNING_PRUNE_RATIO = float(os.getenv('LEARNING_PRUNE_RATIO', '0.05'))
+    
+    # Optional known-driver registry export (CSV or SQLite) used to cross-check extracted fields
+    DRIVER_REGISTRY_PATH = os.getenv('DRIVER_REGISTRY_PATH')
+    
+    # Optional pipeline snapshot that worker processes attach to at startup
+    PIPELINE_SNAPSHOT_PATH = os.getenv('PIPELINE_SNAPSHOT_PATH')
+    
     # Processing Paths
     UPLOAD_DIR = os.getenv('UPLOAD_DIR', 'uploads')
     PROCESSED_DIR = os.getenv('PROCESSED_DIR', 'processed')
     
+    # Work Queue Configuration
+    QUEUE_DB_PATH = os.getenv('QUEUE_DB_PATH', 'queue/jobs.db')
+    QUEUE_SPOOL_DIR = os.getenv('QUEUE_SPOOL_DIR', 'queue/spool')  # FileSpoolJobQueue directory for multi-node setups
+    QUEUE_VISIBILITY_TIMEOUT = float(os.getenv('QUEUE_VISIBILITY_TIMEOUT', '300'))  # Seconds a lease stays valid
+    QUEUE_MAX_ATTEMPTS = int(os.getenv('QUEUE_MAX_ATTEMPTS', '5'))  # Attempts before dead-lettering
+    QUEUE_BACKOFF_BASE = float(os.getenv('QUEUE_BACKOFF_BASE', '5'))  # Seconds before first retry
+    QUEUE_BACKOFF_MAX = float(os.getenv('QUEUE_BACKOFF_MAX', '600'))  # Cap on retry delay
+    
+    _tesseract_config_cache: Dict[str, Tuple[str, str]] = {}
+    
+    @classmethod
+    def get_ocr_profile(cls, name: str) -> Dict:
+        """Get an OCR profile merged over the default profile"""
+        return {**cls.OCR_PROFILES['default'], **cls.OCR_PROFILES.get(name, {})}
+    
+    @classmethod
+    def get_tesseract_config(cls, name: str) -> Tuple[str, str]:
+        """
+        Get the (lang, config) pair pytesseract needs for a profile
+        
+        Config strings are built once per profile and reused across calls.
+        """
+        if name not in cls._tesseract_config_cache:
+            profile = cls.get_ocr_profile(name)
+            options = [f"--oem {profile['oem']}", f"--psm {profile['psm']}"]
+            if profile['dpi']:
+                options.append(f"--dpi {profile['dpi']}")
+            if profile['whitelist']:
+                options.append(f"-c tessedit_char_whitelist={profile['whitelist']}")
+            if profile['disable_dictionaries']:
+                options.append("-c load_system_dawg=0 -c load_freq_dawg=0")
+            cls._tesseract_config_cache[name] = (profile['lang'], " ".join(options))
+        return cls._tesseract_config_cache[name]
+    
     @classmethod
     def get_license_requirements(cls) -> Dict:
         """Get license verification requirements"""
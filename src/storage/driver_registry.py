@@ -0,0 +1,475 @@
+import csv
+import json
+from array import array
+import re
+import sqlite3
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, List, Optional, Iterable, Sequence, Set, Tuple
+import logging
+import numpy as np
+
+# Characters OCR routinely confuses on license numbers, mapped to one representative
+LICENSE_CONFUSIONS = str.maketrans({
+    'O': '0', 'Q': '0', 'D': '0',
+    'I': '1', 'L': '1', '|': '1',
+    'Z': '2',
+    'S': '5',
+    'G': '6',
+    'B': '8',
+})
+
+# Digits OCR produces inside names, mapped back to the letters they stand for
+NAME_CONFUSIONS = str.maketrans({
+    '0': 'O',
+    '1': 'I',
+    '2': 'Z',
+    '5': 'S',
+    '6': 'G',
+    '8': 'B',
+})
+
+
+KEY_PATTERN = re.compile(r'[0-9A-Z]+')
+
+
+def normalize_license_number(text: str) -> str:
+    """
+    Reduce a license number to its OCR-confusion-insensitive key
+
+    Case, spaces and punctuation are dropped and confusable characters collapse
+    onto a single representative, so 'MH12 2O11OO12345' and 'MH1220110012345'
+    share a key.
+    """
+    text = re.sub(r'[^A-Z0-9|]', '', (text or "").upper())
+    return text.translate(LICENSE_CONFUSIONS)
+
+
+def normalize_name(text: str) -> str:
+    """Reduce a name to upper-case letters only, undoing digit-for-letter OCR errors"""
+    text = (text or "").upper().translate(NAME_CONFUSIONS)
+    return re.sub(r'[^A-Z]', '', text)
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance between a and b, bounded by max_distance
+
+    Only the diagonal band of width max_distance is evaluated, and
+    max_distance + 1 is returned as soon as the bound is known to be exceeded.
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    over = max_distance + 1
+    previous = None
+    current = [j if j <= max_distance else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        before, previous = previous, current
+        current = [over] * (len(b) + 1)
+        if i <= max_distance:
+            current[0] = i
+        row_min = current[0]
+        for j in range(max(1, i - max_distance), min(len(b), i + max_distance) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, before[j - 2] + 1)
+            current[j] = min(value, over)
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return over
+    return current[-1]
+
+
+# Index keys are upper-case alphanumerics (what both normalizers produce). A key
+# of up to MAX_PREFIX_LENGTH characters packs exactly into one int64: its base-36
+# value plus an offset for its length, so keys of different lengths never collide.
+MAX_PREFIX_LENGTH = 12
+POWERS = 36 ** np.arange(MAX_PREFIX_LENGTH + 1, dtype=np.int64)
+LENGTH_OFFSETS = np.concatenate(([0], np.cumsum(POWERS)))
+CHAR_CODES = np.zeros(256, dtype=np.int64)
+CHAR_CODES[np.frombuffer(b"0123456789", dtype=np.uint8)] = np.arange(10)
+CHAR_CODES[np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", dtype=np.uint8)] = np.arange(10, 36)
+
+
+def encode_key(key: str) -> int:
+    """Pack a non-empty key of at most MAX_PREFIX_LENGTH characters into an int"""
+    return int(key, 36) + int(LENGTH_OFFSETS[len(key)])
+
+
+def pack_strings(strings: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenate strings into one UTF-8 byte array plus int64 start offsets"""
+    encoded = [text.encode("utf-8") for text in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+class StringTable:
+    """Read-only sequence of strings stored as packed bytes plus offsets"""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class RecordTable(StringTable):
+    """Read-only sequence of records stored as packed JSON, decoded on access"""
+
+    def __getitem__(self, i: int) -> Dict[str, str]:
+        return json.loads(super().__getitem__(i))
+
+
+class SymmetricDeleteIndex:
+    """
+    Approximate string index using the symmetric-deletion technique
+
+    Every key is stored under all variants produced by deleting up to
+    `max_distance` characters from its first `prefix_length` characters. A
+    query generates its own deletion variants, so candidates within the edit
+    distance are found with a binary search per variant instead of a scan.
+
+    Variants are packed into int64 codes and kept in two parallel sorted
+    arrays (variant code, key id), about 12 bytes per variant, rather than as
+    strings in a dict. Keys are added in bulk and the arrays are re-sorted on
+    the next lookup.
+    """
+
+    def __init__(self, max_distance: int = 1, prefix_length: Optional[int] = MAX_PREFIX_LENGTH):
+        self.max_distance = max_distance
+        # Variants must fit the int64 packing, so the prefix is capped
+        self.prefix_length = min(prefix_length or MAX_PREFIX_LENGTH, MAX_PREFIX_LENGTH)
+        # Key ids index key_list; most keys belong to one record, so extra records
+        # sharing a key are kept aside instead of a list per key
+        self.key_ids: Optional[Dict[str, int]] = {}
+        self.key_list: Sequence[str] = []
+        self.key_records = array("i")
+        self.shared_keys: Dict[int, List[int]] = {}
+        self.variant_codes = np.empty(0, dtype=np.int64)
+        self.variant_key_ids = np.empty(0, dtype=np.int32)
+        self._pending: List[Tuple[np.ndarray, np.ndarray]] = []
+
+    def _variants(self, key: str, max_distance: Optional[int] = None) -> Set[str]:
+        key = key[:self.prefix_length]
+        variants = {key}
+        frontier = {key}
+        for _ in range(self.max_distance if max_distance is None else max_distance):
+            next_frontier = set()
+            for word in frontier:
+                if len(word) <= 1:
+                    continue
+                for i in range(len(word)):
+                    next_frontier.add(word[:i] + word[i + 1:])
+            next_frontier -= variants
+            variants |= next_frontier
+            frontier = next_frontier
+        return variants
+
+    def _variant_codes(self, keys: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Codes of every deletion variant of keys, with the row of the key each came from"""
+        width = self.prefix_length
+        trimmed = [key[:width] for key in keys]
+        lengths = np.fromiter(map(len, trimmed), dtype=np.int64, count=len(trimmed))
+        padded = np.array([key.encode("ascii") for key in trimmed], dtype=f"S{width}")
+        codes = CHAR_CODES[padded.view(np.uint8).reshape(len(keys), width)]
+        rows = np.arange(len(keys), dtype=np.int32)
+
+        all_codes, all_rows = [], []
+        for distance in range(self.max_distance + 1):
+            for deleted in combinations(range(width), distance):
+                kept = [i for i in range(width) if i not in deleted]
+                # Deleting a padding position leaves the characters unchanged
+                variant_lengths = lengths - sum((lengths > i).astype(np.int64) for i in deleted)
+                # A key is never reduced to nothing, matching _variants
+                nonempty = variant_lengths > 0
+                left_aligned = codes[nonempty][:, kept] @ POWERS[len(kept) - 1::-1]
+                variant_lengths = variant_lengths[nonempty]
+                all_codes.append(left_aligned // POWERS[len(kept) - variant_lengths] + LENGTH_OFFSETS[variant_lengths])
+                all_rows.append(rows[nonempty])
+        return np.concatenate(all_codes), np.concatenate(all_rows)
+
+    def add(self, key: str, record_id: int):
+        self.add_many([(key, record_id)])
+
+    def add_many(self, items: Iterable[Tuple[str, int]]):
+        """Add (key, record_id) pairs; empty keys are skipped"""
+        if self.key_ids is None:
+            raise TypeError("This index was attached read-only and cannot be extended")
+        new_keys = []
+        for key, record_id in items:
+            if not key:
+                continue
+            if not KEY_PATTERN.fullmatch(key):
+                raise ValueError(f"Index keys must be upper-case alphanumeric: {key!r}")
+            key_id = self.key_ids.get(key)
+            if key_id is not None:
+                self.shared_keys.setdefault(key_id, []).append(record_id)
+                continue
+            self.key_ids[key] = len(self.key_list)
+            self.key_list.append(key)
+            self.key_records.append(record_id)
+            new_keys.append(key)
+        if new_keys:
+            codes, rows = self._variant_codes(new_keys)
+            first_id = len(self.key_list) - len(new_keys)
+            self._pending.append((codes, rows + np.int32(first_id)))
+
+    def record_ids(self, key_id: int) -> List[int]:
+        return [int(self.key_records[key_id])] + self.shared_keys.get(key_id, [])
+
+    def _merge_pending(self):
+        codes = np.concatenate([self.variant_codes] + [c for c, _ in self._pending])
+        key_ids = np.concatenate([self.variant_key_ids] + [k for _, k in self._pending])
+        self._pending = []
+        order = np.lexsort((key_ids, codes))
+        codes, key_ids = codes[order], key_ids[order]
+        unique = np.ones(len(codes), dtype=bool)
+        unique[1:] = (codes[1:] != codes[:-1]) | (key_ids[1:] != key_ids[:-1])
+        self.variant_codes, self.variant_key_ids = codes[unique], key_ids[unique]
+
+    def lookup(self, key: str, max_distance: Optional[int] = None) -> List[Dict]:
+        """
+        Find indexed keys within max_distance of key
+
+        Returns:
+            List of {"key", "distance", "record_ids"} sorted by distance
+        """
+        if not key:
+            return []
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        if not KEY_PATTERN.fullmatch(key):
+            return []
+        if self._pending:
+            self._merge_pending()
+
+        query = np.array([encode_key(variant) for variant in self._variants(key, max_distance)], dtype=np.int64)
+        starts = np.searchsorted(self.variant_codes, query, side="left").tolist()
+        ends = np.searchsorted(self.variant_codes, query, side="right").tolist()
+        candidates = set()
+        for start, end in zip(starts, ends):
+            if end > start:
+                candidates.update(self.variant_key_ids[start:end].tolist())
+
+        matches = []
+        for key_id in candidates:
+            candidate = self.key_list[key_id]
+            distance = edit_distance(key, candidate, max_distance)
+            if distance <= max_distance:
+                matches.append({"key": candidate, "distance": distance, "record_ids": self.record_ids(key_id)})
+        matches.sort(key=lambda m: m["distance"])
+        return matches
+
+    def export_arrays(self) -> Tuple[Dict, Dict[str, np.ndarray]]:
+        """Settings and flat arrays that from_arrays rebuilds the index from"""
+        if self._pending:
+            self._merge_pending()
+        keys, key_offsets = pack_strings(self.key_list)
+        meta = {
+            "max_distance": self.max_distance,
+            "prefix_length": self.prefix_length,
+            "shared_keys": {str(key_id): ids for key_id, ids in self.shared_keys.items()}
+        }
+        return meta, {
+            "codes": self.variant_codes,
+            "key_ids": self.variant_key_ids,
+            "key_records": np.asarray(self.key_records, dtype=np.int32),
+            "keys": keys,
+            "key_offsets": key_offsets
+        }
+
+    @classmethod
+    def from_arrays(cls, meta: Dict, arrays: Dict[str, np.ndarray]) -> "SymmetricDeleteIndex":
+        """
+        Read-only index over exported arrays, used as they are without copying
+
+        Passing arrays that view a memory-mapped file lets every process
+        query the same physical pages.
+        """
+        index = cls(meta["max_distance"], meta["prefix_length"])
+        index.key_ids = None
+        index.key_list = StringTable(arrays["keys"], arrays["key_offsets"])
+        index.key_records = arrays["key_records"]
+        index.shared_keys = {int(key_id): ids for key_id, ids in meta["shared_keys"].items()}
+        index.variant_codes = arrays["codes"]
+        index.variant_key_ids = arrays["key_ids"]
+        return index
+
+
+class DriverRegistry:
+    """
+    In-memory lookup index over the known-driver export
+
+    License numbers and names are normalized for OCR confusions and indexed
+    for approximate matching, so extracted fields can be checked against the
+    registry despite O/0, I/1 and dropped-space noise.
+    """
+
+    def __init__(self, license_max_distance: int = 1, name_max_distance: int = 2,
+                 name_prefix_length: Optional[int] = 12):
+        self.logger = logging.getLogger(__name__)
+        self.records: Sequence[Dict[str, str]] = []
+        self.license_index = SymmetricDeleteIndex(license_max_distance)
+        self.name_max_distance = name_max_distance
+        self.name_prefix_length = name_prefix_length
+        # Built on the first lookup_name; verify() compares names directly and never needs it
+        self._name_index: Optional[SymmetricDeleteIndex] = None
+
+    @classmethod
+    def from_csv(cls, path: str, **kwargs) -> "DriverRegistry":
+        """Load a registry from a CSV export with `license_number` and `name` columns"""
+        registry = cls(**kwargs)
+        with open(path, newline="") as f:
+            registry.add_records(csv.DictReader(f))
+        return registry
+
+    @classmethod
+    def from_sqlite(cls, path: str, table: str = "drivers", **kwargs) -> "DriverRegistry":
+        """Load a registry from a SQLite export with `license_number` and `name` columns"""
+        registry = cls(**kwargs)
+        conn = sqlite3.connect(path)
+        conn.row_factory = sqlite3.Row
+        try:
+            # Table names cannot be bound as parameters; only allow plain identifiers
+            if not re.fullmatch(r'\w+', table):
+                raise ValueError(f"Invalid table name: {table}")
+            registry.add_records(dict(row) for row in conn.execute(f"SELECT * FROM {table}"))
+        finally:
+            conn.close()
+        return registry
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "DriverRegistry":
+        """Load a registry from a CSV or SQLite file, chosen by extension"""
+        if path.lower().endswith((".db", ".sqlite", ".sqlite3")):
+            return cls.from_sqlite(path, **kwargs)
+        return cls.from_csv(path, **kwargs)
+
+    def add_records(self, records: Iterable[Dict[str, str]], chunk_size: int = 50000):
+        if isinstance(self.records, RecordTable):
+            raise TypeError("This registry was attached read-only and cannot be extended")
+        # Index in chunks so the variant arrays are built with a few vectorized passes
+        start = len(self.records)
+        for record in records:
+            self.records.append(record)
+            if len(self.records) - start >= chunk_size:
+                self._index_records(start, len(self.records))
+                start = len(self.records)
+        self._index_records(start, len(self.records))
+        self.logger.info(f"Driver registry holds {len(self.records)} records")
+
+    def _index_records(self, start: int, end: int):
+        self.license_index.add_many(
+            (normalize_license_number(self.records[i].get("license_number")), i) for i in range(start, end)
+        )
+        if self._name_index is not None:
+            self._name_index.add_many((normalize_name(self.records[i].get("name")), i) for i in range(start, end))
+
+    def lookup_license(self, license_number: str) -> List[Dict]:
+        """
+        Find registry records whose license number approximately matches
+
+        Returns:
+            List of {"record", "distance"} sorted by distance
+        """
+        return [
+            {"record": self.records[record_id], "distance": match["distance"]}
+            for match in self.license_index.lookup(normalize_license_number(license_number))
+            for record_id in match["record_ids"]
+        ]
+
+    @property
+    def name_index(self) -> SymmetricDeleteIndex:
+        if self._name_index is None:
+            index = SymmetricDeleteIndex(self.name_max_distance, prefix_length=self.name_prefix_length)
+            index.add_many((normalize_name(record.get("name")), i) for i, record in enumerate(self.records))
+            self._name_index = index
+        return self._name_index
+
+    def lookup_name(self, name: str) -> List[Dict]:
+        """Find registry records whose name approximately matches"""
+        return [
+            {"record": self.records[record_id], "distance": match["distance"]}
+            for match in self.name_index.lookup(normalize_name(name))
+            for record_id in match["record_ids"]
+        ]
+
+    def verify(self, license_number: str, name: str) -> Dict:
+        """
+        Cross-check an extracted license number and name against the registry
+
+        Returns:
+            Dict with status 'matched', 'name_mismatch' or 'not_found', plus the
+            best registry record when one was found
+        """
+        candidates = self.lookup_license(license_number)
+        if not candidates:
+            return {"status": "not_found"}
+
+        name_key = normalize_name(name)
+        max_name_distance = self.name_max_distance
+        for candidate in candidates:
+            name_distance = edit_distance(name_key, normalize_name(candidate["record"].get("name")), max_name_distance)
+            if name_distance <= max_name_distance:
+                return {
+                    "status": "matched",
+                    "record": candidate["record"],
+                    "license_distance": candidate["distance"],
+                    "name_distance": name_distance
+                }
+        return {"status": "name_mismatch", "record": candidates[0]["record"]}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def export_arrays(self) -> Tuple[Dict, Dict[str, np.ndarray]]:
+        """
+        Settings plus flat arrays holding the records and built indexes
+
+        The name index is only included if it was already built.
+        """
+        records, record_offsets = pack_strings(json.dumps(record, default=str) for record in self.records)
+        meta = {"name_max_distance": self.name_max_distance, "name_prefix_length": self.name_prefix_length}
+        arrays = {"records": records, "record_offsets": record_offsets}
+        indexes = {"license": self.license_index, "name": self._name_index}
+        for prefix, index in indexes.items():
+            if index is None:
+                continue
+            meta[prefix], index_arrays = index.export_arrays()
+            arrays.update({f"{prefix}.{name}": array for name, array in index_arrays.items()})
+        return meta, arrays
+
+    @classmethod
+    def from_arrays(cls, meta: Dict, arrays: Dict[str, np.ndarray]) -> "DriverRegistry":
+        """Read-only registry over exported arrays, used without copying; see SymmetricDeleteIndex.from_arrays"""
+        registry = cls(name_max_distance=meta["name_max_distance"], name_prefix_length=meta["name_prefix_length"])
+        registry.records = RecordTable(arrays["records"], arrays["record_offsets"])
+        for prefix in ("license", "name"):
+            if prefix in meta:
+                index_arrays = {name[len(prefix) + 1:]: array for name, array in arrays.items()
+                                if name.startswith(f"{prefix}.")}
+                index = SymmetricDeleteIndex.from_arrays(meta[prefix], index_arrays)
+                if prefix == "license":
+                    registry.license_index = index
+                else:
+                    registry._name_index = index
+        return registry
+
+
+@lru_cache(maxsize=None)
+def load_registry(path: str) -> DriverRegistry:
+    """Load a registry once per process and share it between verifiers"""
+    return DriverRegistry.load(path)
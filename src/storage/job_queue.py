@@ -0,0 +1,547 @@
+import json
+import os
+import random
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+import logging
+
+from ..config.settings import Settings
+
+
+class JobQueue(ABC):
+    """
+    Interface for queues that hand out document processing jobs to workers.
+
+    Jobs are plain dicts with at least `id`, `document_path`, `document_type`,
+    `attempts` and `lease_token`. A leased job stays invisible to other workers
+    until its lease expires, after which it is handed out again.
+    """
+
+    @abstractmethod
+    def enqueue(self, document_path: str, document_type: str = "driver_license",
+                job_id: Optional[str] = None) -> str:
+        """Add a document to the queue and return its job id"""
+
+    @abstractmethod
+    def lease(self, worker_id: str, limit: int = 1) -> List[Dict]:
+        """Lease up to `limit` ready jobs for `worker_id`"""
+
+    @abstractmethod
+    def extend_lease(self, job: Dict, seconds: Optional[float] = None) -> bool:
+        """Push back the lease expiry of a job still held by the caller"""
+
+    @abstractmethod
+    def complete(self, job: Dict, result: Dict) -> bool:
+        """Store the result of a job; returns True if this call stored it"""
+
+    @abstractmethod
+    def fail(self, job: Dict, error: str) -> str:
+        """Record a failed attempt and return the job's new state"""
+
+    @abstractmethod
+    def get_result(self, job_id: str) -> Optional[Dict]:
+        """Stored result of a job, or None"""
+
+    @abstractmethod
+    def dead_letters(self, limit: int = 100) -> List[Dict]:
+        """Jobs in the dead-letter state with their last error"""
+
+    @abstractmethod
+    def requeue_dead(self, job_id: str) -> bool:
+        """Move a dead-lettered job back to the queue"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Number of jobs per state"""
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Durable job queue backed by a single SQLite database file.
+
+    Any number of worker processes on one host can consume the same file.
+    The database runs in WAL mode, which relies on a shared-memory index and
+    so does not work across hosts: nodes on shared storage (NFS, SMB) should
+    use FileSpoolJobQueue instead. Leasing runs inside a short
+    `BEGIN IMMEDIATE` transaction so a job is only ever handed to one worker
+    at a time.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            document_path TEXT NOT NULL,
+            document_type TEXT NOT NULL,
+            state TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            available_at REAL NOT NULL,
+            lease_token TEXT,
+            lease_owner TEXT,
+            lease_expires_at REAL,
+            last_error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (state, available_at);
+        CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (state, lease_expires_at);
+        CREATE TABLE IF NOT EXISTS results (
+            job_id TEXT PRIMARY KEY,
+            result TEXT NOT NULL,
+            worker_id TEXT,
+            completed_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, db_path: Optional[str] = None,
+                 visibility_timeout: Optional[float] = None,
+                 max_attempts: Optional[int] = None,
+                 backoff_base: Optional[float] = None,
+                 backoff_max: Optional[float] = None):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = db_path or Settings.QUEUE_DB_PATH
+        self.visibility_timeout = visibility_timeout if visibility_timeout is not None else Settings.QUEUE_VISIBILITY_TIMEOUT
+        self.max_attempts = max_attempts if max_attempts is not None else Settings.QUEUE_MAX_ATTEMPTS
+        self.backoff_base = backoff_base if backoff_base is not None else Settings.QUEUE_BACKOFF_BASE
+        self.backoff_max = backoff_max if backoff_max is not None else Settings.QUEUE_BACKOFF_MAX
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        # WAL lets readers proceed while a worker holds the write lock; it needs every
+        # process on the same host, which is why this queue is single-host only
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def enqueue(self, document_path: str, document_type: str = "driver_license",
+                job_id: Optional[str] = None) -> str:
+        """
+        Add a document to the queue
+
+        Args:
+            document_path: Path to the document, readable by every worker
+            document_type: Type of document passed on to DocumentManagerAgent
+            job_id: Optional caller-chosen id; enqueueing the same id twice is a no-op
+
+        Returns:
+            The job id
+        """
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR IGNORE INTO jobs (id, document_path, document_type, state, attempts, "
+            "available_at, created_at, updated_at) VALUES (?, ?, ?, 'queued', 0, ?, ?, ?)",
+            (job_id, document_path, document_type, now, now, now)
+        )
+        return job_id
+
+    def lease(self, worker_id: str, limit: int = 1) -> List[Dict]:
+        """
+        Lease up to `limit` ready jobs for `worker_id`
+
+        Jobs whose previous lease expired are handed out again, unless they
+        already used up their attempts, in which case they are dead-lettered.
+        """
+        now = time.time()
+        leased = []
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired leases that exhausted their attempts go to the dead-letter state
+            self.conn.execute(
+                "UPDATE jobs SET state = 'dead', lease_token = NULL, lease_owner = NULL, "
+                "last_error = COALESCE(last_error, 'lease expired'), updated_at = ? "
+                "WHERE state = 'leased' AND lease_expires_at <= ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            rows = self.conn.execute(
+                "SELECT * FROM jobs WHERE (state = 'queued' AND available_at <= ?) "
+                "OR (state = 'leased' AND lease_expires_at <= ?) "
+                "ORDER BY available_at LIMIT ?",
+                (now, now, limit)
+            ).fetchall()
+            for row in rows:
+                token = uuid.uuid4().hex
+                expires_at = now + self.visibility_timeout
+                self.conn.execute(
+                    "UPDATE jobs SET state = 'leased', attempts = attempts + 1, lease_token = ?, "
+                    "lease_owner = ?, lease_expires_at = ?, updated_at = ? WHERE id = ?",
+                    (token, worker_id, expires_at, now, row["id"])
+                )
+                leased.append({
+                    "id": row["id"],
+                    "document_path": row["document_path"],
+                    "document_type": row["document_type"],
+                    "attempts": row["attempts"] + 1,
+                    "lease_token": token,
+                    "lease_owner": worker_id,
+                    "lease_expires_at": expires_at
+                })
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return leased
+
+    def extend_lease(self, job: Dict, seconds: Optional[float] = None) -> bool:
+        """Push back the lease expiry of a job still held by the caller"""
+        expires_at = time.time() + (seconds if seconds is not None else self.visibility_timeout)
+        cursor = self.conn.execute(
+            "UPDATE jobs SET lease_expires_at = ?, updated_at = ? "
+            "WHERE id = ? AND state = 'leased' AND lease_token = ?",
+            (expires_at, time.time(), job["id"], job["lease_token"])
+        )
+        if cursor.rowcount:
+            job["lease_expires_at"] = expires_at
+            return True
+        return False
+
+    def complete(self, job: Dict, result: Dict) -> bool:
+        """
+        Store the result of a job and mark it done
+
+        Result writes are idempotent: the first result stored for a job wins and
+        later writes (e.g. from a worker whose lease expired) are ignored.
+
+        Returns:
+            True if this call stored the result
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO results (job_id, result, worker_id, completed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (job["id"], json.dumps(result, default=str), job.get("lease_owner"), now)
+            )
+            stored = cursor.rowcount > 0
+            self.conn.execute(
+                "UPDATE jobs SET state = 'done', lease_token = NULL, lease_expires_at = NULL, "
+                "updated_at = ? WHERE id = ?",
+                (now, job["id"])
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        if not stored:
+            self.logger.info(f"Result for job {job['id']} already recorded, ignoring duplicate")
+        return stored
+
+    def fail(self, job: Dict, error: str) -> str:
+        """
+        Record a failed attempt
+
+        The job is retried with exponential backoff until it reaches
+        `max_attempts`, after which it is moved to the dead-letter state.
+
+        Returns:
+            The new job state ('queued', 'dead', or 'lost' if the lease was no longer held)
+        """
+        now = time.time()
+        if job["attempts"] >= self.max_attempts:
+            state, available_at = "dead", now
+        else:
+            delay = min(self.backoff_max, self.backoff_base * (2 ** (job["attempts"] - 1)))
+            # Jitter keeps workers that failed together from retrying in lockstep
+            state, available_at = "queued", now + delay * random.uniform(0.5, 1.0)
+        cursor = self.conn.execute(
+            "UPDATE jobs SET state = ?, available_at = ?, last_error = ?, lease_token = NULL, "
+            "lease_owner = NULL, lease_expires_at = NULL, updated_at = ? "
+            "WHERE id = ? AND state = 'leased' AND lease_token = ?",
+            (state, available_at, error, now, job["id"], job["lease_token"])
+        )
+        if not cursor.rowcount:
+            return "lost"
+        if state == "dead":
+            self.logger.warning(f"Job {job['id']} moved to dead-letter queue after {job['attempts']} attempts: {error}")
+        return state
+
+    def get_result(self, job_id: str) -> Optional[Dict]:
+        row = self.conn.execute("SELECT result FROM results WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row["result"]) if row else None
+
+    def dead_letters(self, limit: int = 100) -> List[Dict]:
+        """List jobs in the dead-letter state with their last error"""
+        rows = self.conn.execute(
+            "SELECT id, document_path, document_type, attempts, last_error FROM jobs "
+            "WHERE state = 'dead' ORDER BY updated_at LIMIT ?",
+            (limit,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def requeue_dead(self, job_id: str) -> bool:
+        """Move a dead-lettered job back to the queue with a fresh attempt budget"""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET state = 'queued', attempts = 0, available_at = ?, updated_at = ? "
+            "WHERE id = ? AND state = 'dead'",
+            (time.time(), time.time(), job_id)
+        )
+        return cursor.rowcount > 0
+
+    def stats(self) -> Dict[str, int]:
+        rows = self.conn.execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state").fetchall()
+        return {row["state"]: row["n"] for row in rows}
+
+
+class FileSpoolJobQueue(JobQueue):
+    """
+    Durable job queue kept as one JSON file per job in a spool directory.
+
+    Meant for worker nodes that share the spool over a network filesystem.
+    Every state change is an atomic rename between the `ready`, `leased`,
+    `done` and `dead` subdirectories, so whichever worker renames a job file
+    first owns it; no file locks or shared memory are needed. A leased job's
+    file carries the lease token in its name and the lease expiry as its
+    mtime, so extending a lease is a single utime call.
+
+    Node clocks must be roughly in sync, since lease expiry is compared
+    against the local clock of the worker that reclaims it.
+    """
+
+    STATES = {"ready": "queued", "leased": "leased", "done": "done", "dead": "dead"}
+
+    def __init__(self, spool_dir: Optional[str] = None,
+                 visibility_timeout: Optional[float] = None,
+                 max_attempts: Optional[int] = None,
+                 backoff_base: Optional[float] = None,
+                 backoff_max: Optional[float] = None):
+        self.logger = logging.getLogger(__name__)
+        self.spool_dir = spool_dir or Settings.QUEUE_SPOOL_DIR
+        self.visibility_timeout = visibility_timeout if visibility_timeout is not None else Settings.QUEUE_VISIBILITY_TIMEOUT
+        self.max_attempts = max_attempts if max_attempts is not None else Settings.QUEUE_MAX_ATTEMPTS
+        self.backoff_base = backoff_base if backoff_base is not None else Settings.QUEUE_BACKOFF_BASE
+        self.backoff_max = backoff_max if backoff_max is not None else Settings.QUEUE_BACKOFF_MAX
+        for name in list(self.STATES) + ["results", "tmp"]:
+            os.makedirs(os.path.join(self.spool_dir, name), exist_ok=True)
+
+    def close(self):
+        pass
+
+    def _path(self, directory: str, name: str) -> str:
+        return os.path.join(self.spool_dir, directory, name)
+
+    def _read(self, path: str) -> Optional[Dict]:
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write(self, path: str, data: Dict, mtime: Optional[float] = None):
+        """Write a job file through a private temporary file, then swap it in"""
+        tmp_path = self._path("tmp", f"{uuid.uuid4().hex}.json")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, default=str)
+        if mtime is not None:
+            os.utime(tmp_path, (mtime, mtime))
+        os.replace(tmp_path, path)
+
+    def _move(self, path: str, target: str) -> bool:
+        """Claim a job file by renaming it; False if another worker got it first"""
+        try:
+            os.rename(path, target)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _take(self, path: str) -> Optional[str]:
+        """Claim a job file by renaming it into tmp; None if another worker got it first"""
+        claimed = self._path("tmp", f"{uuid.uuid4().hex}.{os.path.basename(path)}")
+        return claimed if self._move(path, claimed) else None
+
+    def _leased_paths(self, job_id: str) -> List[str]:
+        prefix = f"{job_id}."
+        return [self._path("leased", name) for name in os.listdir(self._path("leased", ""))
+                if name.startswith(prefix)]
+
+    def enqueue(self, document_path: str, document_type: str = "driver_license",
+                job_id: Optional[str] = None) -> str:
+        """
+        Add a document to the queue
+
+        Args:
+            document_path: Path to the document, readable by every worker
+            document_type: Type of document passed on to DocumentManagerAgent
+            job_id: Optional caller-chosen id; enqueueing the same id twice is a no-op
+
+        Returns:
+            The job id
+        """
+        job_id = job_id or uuid.uuid4().hex
+        name = f"{job_id}.json"
+        if (any(os.path.exists(self._path(d, name)) for d in ("ready", "done", "dead"))
+                or self._leased_paths(job_id)):
+            return job_id
+        now = time.time()
+        self._write(self._path("ready", name), {
+            "id": job_id,
+            "document_path": document_path,
+            "document_type": document_type,
+            "attempts": 0,
+            "available_at": now,
+            "last_error": None,
+            "created_at": now
+        })
+        return job_id
+
+    def lease(self, worker_id: str, limit: int = 1) -> List[Dict]:
+        """
+        Lease up to `limit` ready jobs for `worker_id`
+
+        Jobs whose previous lease expired are handed out again, unless they
+        already used up their attempts, in which case they are dead-lettered.
+        """
+        now = time.time()
+        candidates = []
+        for name in os.listdir(self._path("leased", "")):
+            path = self._path("leased", name)
+            try:
+                if os.path.getmtime(path) <= now:
+                    candidates.append((path, name.split(".", 1)[0]))
+            except FileNotFoundError:
+                continue
+        for name in sorted(os.listdir(self._path("ready", ""))):
+            candidates.append((self._path("ready", name), name[:-len(".json")]))
+
+        leased = []
+        for path, job_id in candidates:
+            if len(leased) >= limit:
+                break
+            data = self._read(path)
+            if data is None or data["available_at"] > now:
+                continue
+            if path.startswith(self._path("leased", "")) and data["attempts"] >= self.max_attempts:
+                # Expired leases that exhausted their attempts go to the dead-letter state
+                dead_path = self._path("dead", f"{job_id}.json")
+                if self._move(path, dead_path):
+                    data["last_error"] = data.get("last_error") or "lease expired"
+                    self._write(dead_path, data)
+                continue
+
+            token = uuid.uuid4().hex
+            expires_at = now + self.visibility_timeout
+            leased_path = self._path("leased", f"{job_id}.{token}.json")
+            try:
+                # Set the expiry before the rename so the new lease is never seen as expired
+                os.utime(path, (expires_at, expires_at))
+            except FileNotFoundError:
+                continue
+            if not self._move(path, leased_path):
+                continue
+            data["attempts"] += 1
+            self._write(leased_path, data, mtime=expires_at)
+            leased.append({
+                "id": job_id,
+                "document_path": data["document_path"],
+                "document_type": data["document_type"],
+                "attempts": data["attempts"],
+                "lease_token": token,
+                "lease_owner": worker_id,
+                "lease_expires_at": expires_at
+            })
+        return leased
+
+    def extend_lease(self, job: Dict, seconds: Optional[float] = None) -> bool:
+        """Push back the lease expiry of a job still held by the caller"""
+        expires_at = time.time() + (seconds if seconds is not None else self.visibility_timeout)
+        try:
+            os.utime(self._path("leased", f"{job['id']}.{job['lease_token']}.json"), (expires_at, expires_at))
+        except FileNotFoundError:
+            return False
+        job["lease_expires_at"] = expires_at
+        return True
+
+    def complete(self, job: Dict, result: Dict) -> bool:
+        """
+        Store the result of a job and mark it done
+
+        Result writes are idempotent: the result is hard-linked into place,
+        which fails if a result already exists, so the first one wins.
+
+        Returns:
+            True if this call stored the result
+        """
+        tmp_path = self._path("tmp", f"{uuid.uuid4().hex}.json")
+        with open(tmp_path, "w") as f:
+            json.dump({"result": result, "worker_id": job.get("lease_owner"), "completed_at": time.time()},
+                      f, default=str)
+        try:
+            os.link(tmp_path, self._path("results", f"{job['id']}.json"))
+            stored = True
+        except FileExistsError:
+            stored = False
+        finally:
+            os.remove(tmp_path)
+
+        # Retire the job file, whichever lease currently holds it
+        for path in self._leased_paths(job["id"]) + [self._path("ready", f"{job['id']}.json")]:
+            self._move(path, self._path("done", f"{job['id']}.json"))
+        if not stored:
+            self.logger.info(f"Result for job {job['id']} already recorded, ignoring duplicate")
+        return stored
+
+    def fail(self, job: Dict, error: str) -> str:
+        """
+        Record a failed attempt
+
+        The job is retried with exponential backoff until it reaches
+        `max_attempts`, after which it is moved to the dead-letter state.
+
+        Returns:
+            The new job state ('queued', 'dead', or 'lost' if the lease was no longer held)
+        """
+        claimed = self._take(self._path("leased", f"{job['id']}.{job['lease_token']}.json"))
+        if claimed is None:
+            return "lost"
+        data = self._read(claimed)
+        now = time.time()
+        if job["attempts"] >= self.max_attempts:
+            state, directory, available_at = "dead", "dead", now
+        else:
+            delay = min(self.backoff_max, self.backoff_base * (2 ** (job["attempts"] - 1)))
+            # Jitter keeps workers that failed together from retrying in lockstep
+            state, directory, available_at = "queued", "ready", now + delay * random.uniform(0.5, 1.0)
+        data.update({"available_at": available_at, "last_error": error})
+        self._write(self._path(directory, f"{job['id']}.json"), data)
+        os.remove(claimed)
+        if state == "dead":
+            self.logger.warning(f"Job {job['id']} moved to dead-letter queue after {job['attempts']} attempts: {error}")
+        return state
+
+    def get_result(self, job_id: str) -> Optional[Dict]:
+        data = self._read(self._path("results", f"{job_id}.json"))
+        return data["result"] if data else None
+
+    def dead_letters(self, limit: int = 100) -> List[Dict]:
+        """List jobs in the dead-letter state with their last error"""
+        paths = [self._path("dead", name) for name in os.listdir(self._path("dead", ""))]
+        dead = []
+        for path in sorted(paths, key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0)[:limit]:
+            data = self._read(path)
+            if data is not None:
+                dead.append({key: data[key] for key in
+                             ("id", "document_path", "document_type", "attempts", "last_error")})
+        return dead
+
+    def requeue_dead(self, job_id: str) -> bool:
+        """Move a dead-lettered job back to the queue with a fresh attempt budget"""
+        claimed = self._take(self._path("dead", f"{job_id}.json"))
+        if claimed is None:
+            return False
+        data = self._read(claimed)
+        data.update({"attempts": 0, "available_at": time.time()})
+        self._write(self._path("ready", f"{job_id}.json"), data)
+        os.remove(claimed)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        counts = {state: len(os.listdir(self._path(directory, ""))) for directory, state in self.STATES.items()}
+        return {state: n for state, n in counts.items() if n}
@@ -0,0 +1,258 @@
+import gc
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+from functools import lru_cache
+from typing import Dict, Any, Optional
+import logging
+import numpy as np
+
+from ..config.settings import Settings
+from .driver_registry import DriverRegistry
+
+MAGIC = b"DLPSNAP\0"
+FORMAT_VERSION = 1
+# Header: magic, format version, section count; then one table entry per section
+HEADER = struct.Struct("<8sII")
+SECTION = struct.Struct("<32sQQ")
+
+
+def settings_fingerprint() -> str:
+    """Hash of the settings baked into a snapshot; a mismatch means the snapshot is stale"""
+    relevant = {
+        "ocr_profiles": Settings.OCR_PROFILES,
+        "ocr_document_profiles": Settings.OCR_DOCUMENT_PROFILES,
+        "learning_half_life_days": Settings.LEARNING_HALF_LIFE_DAYS,
+        "driver_registry_path": Settings.DRIVER_REGISTRY_PATH,
+    }
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def file_signature(path: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Path, mtime and size of a source file, or None if it does not exist"""
+    if not path or not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return {"path": path, "mtime": stat.st_mtime, "size": stat.st_size}
+
+
+def build_snapshot(path: str, learning_manager=None, registry=None,
+                   registry_path: Optional[str] = None) -> str:
+    """
+    Serialize the ready-to-run pipeline state into a snapshot file
+
+    Sections:
+        meta: format details and the settings fingerprint
+        ocr_configs: prebuilt pytesseract (lang, config) pairs for every profile
+        learning: decayed pattern scores, from which pattern order is derived
+        registry: settings of the driver registry, if one is given, with its
+            records and index arrays stored raw in `registry/<array>` sections
+
+    Every section is JSON or a raw numpy array, so attaching never executes
+    anything from the file.
+
+    `registry_path` (default: DRIVER_REGISTRY_PATH) is the file the registry
+    was loaded from; its mtime and size are recorded so the section is
+    ignored once the export changes.
+
+    The file is written to a temporary path and swapped in, so workers never
+    attach to a partial snapshot.
+
+    Returns:
+        The snapshot path
+    """
+    sections: Dict[str, bytes] = {}
+    meta = {
+        "created_at": time.time(),
+        "fingerprint": settings_fingerprint(),
+        "learning_model_path": learning_manager.model_path if learning_manager else None,
+        "registry_source": file_signature(registry_path or Settings.DRIVER_REGISTRY_PATH) if registry is not None else None,
+    }
+    sections["meta"] = json.dumps(meta).encode("utf-8")
+    sections["ocr_configs"] = json.dumps(
+        {name: Settings.get_tesseract_config(name) for name in Settings.OCR_PROFILES}
+    ).encode("utf-8")
+    if learning_manager is not None:
+        sections["learning"] = json.dumps(learning_manager.export_state()).encode("utf-8")
+    if registry is not None:
+        registry_meta, arrays = registry.export_arrays()
+        registry_meta["arrays"] = {name: array.dtype.str for name, array in arrays.items()}
+        sections["registry"] = json.dumps(registry_meta).encode("utf-8")
+        for name, array in arrays.items():
+            sections[f"registry/{name}"] = np.ascontiguousarray(array).tobytes()
+
+    # Section bodies start after the header and table, each aligned to a page
+    table_size = HEADER.size + SECTION.size * len(sections)
+    offset = mmap.PAGESIZE * ((table_size + mmap.PAGESIZE - 1) // mmap.PAGESIZE)
+    entries = []
+    for name, body in sections.items():
+        entries.append((name, offset, len(body)))
+        offset += mmap.PAGESIZE * ((len(body) + mmap.PAGESIZE - 1) // mmap.PAGESIZE)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(entries)))
+        for name, body_offset, length in entries:
+            f.write(SECTION.pack(name.encode("utf-8"), body_offset, length))
+        for name, body_offset, length in entries:
+            f.seek(body_offset)
+            f.write(sections[name])
+    os.replace(tmp_path, path)
+    return path
+
+
+class PipelineSnapshot:
+    """
+    Read-only view of a snapshot file
+
+    The file is memory-mapped. The registry's records and index arrays are
+    queried in place as numpy views of the mapping, so every process attached
+    to the same snapshot shares those pages through the OS page cache, with
+    fork or spawn. The small JSON sections are decoded into each process's
+    own heap on first access.
+    """
+
+    def __init__(self, path: str):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a pipeline snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version {version} (expected {FORMAT_VERSION})")
+
+        self.sections: Dict[str, tuple] = {}
+        for i in range(count):
+            name, offset, length = SECTION.unpack_from(self._map, HEADER.size + i * SECTION.size)
+            self.sections[name.rstrip(b"\0").decode("utf-8")] = (offset, length)
+        self._decoded: Dict[str, Any] = {}
+        self._registry = None
+        self.meta = self._section("meta")
+
+    def _section(self, name: str) -> Optional[Any]:
+        if name not in self.sections:
+            return None
+        if name not in self._decoded:
+            offset, length = self.sections[name]
+            self._decoded[name] = json.loads(self._map[offset:offset + length])
+        return self._decoded[name]
+
+    def _array(self, name: str, dtype: str) -> np.ndarray:
+        """Read-only numpy view of a raw section, backed by the mapping itself"""
+        offset, length = self.sections[name]
+        dtype = np.dtype(dtype)
+        if not length:
+            return np.empty(0, dtype=dtype)
+        return np.frombuffer(self._map, dtype=dtype, count=length // dtype.itemsize, offset=offset)
+
+    def is_compatible(self) -> bool:
+        """Whether the snapshot was built with the current settings"""
+        return self.meta.get("fingerprint") == settings_fingerprint()
+
+    def ocr_configs(self) -> Dict[str, tuple]:
+        return {name: tuple(config) for name, config in (self._section("ocr_configs") or {}).items()}
+
+    def learning_state(self, model_path: Optional[str] = None) -> Optional[Dict]:
+        """Learning state, only if it was built for the given model path"""
+        if model_path is not None and model_path != self.meta.get("learning_model_path"):
+            return None
+        return self._section("learning")
+
+    def registry(self) -> Optional[DriverRegistry]:
+        """
+        Read-only registry queried straight from the mapping
+
+        Returns None if the snapshot has no registry or its source file
+        changed since the snapshot was built.
+        """
+        meta = self._section("registry")
+        if meta is None:
+            return None
+        source = self.meta.get("registry_source")
+        if source and file_signature(source["path"]) != source:
+            self.logger.warning(f"Ignoring snapshot registry: {source['path']} changed since the snapshot was built")
+            return None
+        if self._registry is None:
+            arrays = {name: self._array(f"registry/{name}", dtype) for name, dtype in meta["arrays"].items()}
+            self._registry = DriverRegistry.from_arrays(meta, arrays)
+        return self._registry
+
+    def load_all(self):
+        """Decode every JSON section up front, e.g. in a parent process before forking"""
+        for name in self.sections:
+            if "/" not in name:
+                self._section(name)
+        self.registry()
+
+    def close(self):
+        self._decoded.clear()
+        self._registry = None
+        try:
+            self._map.close()
+        except BufferError:
+            # Registry arrays handed out earlier still view the mapping; it is
+            # unmapped once the last of them is released
+            pass
+
+
+@lru_cache(maxsize=None)
+def attach_snapshot(path: Optional[str] = None) -> Optional[PipelineSnapshot]:
+    """
+    Attach to the configured snapshot once per process
+
+    Returns None when no snapshot is configured, the file is missing, or it
+    was built with different settings, in which case callers build their
+    state the usual way.
+    """
+    path = path or Settings.PIPELINE_SNAPSHOT_PATH
+    if not path or not os.path.exists(path):
+        return None
+    logger = logging.getLogger(__name__)
+    try:
+        snapshot = PipelineSnapshot(path)
+    except (ValueError, struct.error) as e:
+        logger.warning(f"Ignoring pipeline snapshot {path}: {str(e)}")
+        return None
+    if not snapshot.is_compatible():
+        logger.warning(f"Ignoring pipeline snapshot {path}: built with different settings")
+        snapshot.close()
+        return None
+    # Reuse the prebuilt Tesseract configs instead of rebuilding them per profile
+    for name, config in snapshot.ocr_configs().items():
+        Settings._tesseract_config_cache.setdefault(name, config)
+    return snapshot
+
+
+def warm_start(path: Optional[str] = None) -> Optional[PipelineSnapshot]:
+    """
+    Attach and fully decode the snapshot, then freeze the heap
+
+    Call this in the parent of a forking worker pool: children inherit the
+    decoded state, and gc.freeze() keeps the collector from touching (and
+    so copying) those pages in every child.
+    """
+    snapshot = attach_snapshot(path)
+    if snapshot is not None:
+        snapshot.load_all()
+        gc.freeze()
+    return snapshot
+
+
+if __name__ == "__main__":
+    import sys
+    from ..agents.learning_manager import LearningManager
+
+    logging.basicConfig(level=logging.INFO)
+    output_path = sys.argv[1] if len(sys.argv) > 1 else (Settings.PIPELINE_SNAPSHOT_PATH or "models/pipeline.snapshot")
+    registry = DriverRegistry.load(Settings.DRIVER_REGISTRY_PATH) if Settings.DRIVER_REGISTRY_PATH else None
+    build_snapshot(output_path, LearningManager(), registry)
+    print(f"Wrote pipeline snapshot to {output_path}")
@@ -0,0 +1,174 @@
+import gzip
+import json
+import os
+import re
+import time
+from collections import Counter
+from typing import Dict, Optional
+import logging
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+
+def _dumps(record: Dict) -> bytes:
+    """Serialize a record as one compact JSON line"""
+    if orjson is not None:
+        return orjson.dumps(record, default=str, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+
+
+class ConfidenceStats:
+    """Count, mean, min, max and a fixed-bin histogram of confidence values"""
+
+    BIN_WIDTH = 10
+
+    def __init__(self):
+        self.histogram = [0] * (100 // self.BIN_WIDTH)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, confidence: float):
+        bin_index = min(max(int(confidence // self.BIN_WIDTH), 0), len(self.histogram) - 1)
+        self.histogram[bin_index] += 1
+        self.count += 1
+        self.sum += confidence
+        self.min = confidence if self.min is None else min(self.min, confidence)
+        self.max = confidence if self.max is None else max(self.max, confidence)
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "histogram": {
+                f"{i * self.BIN_WIDTH}-{(i + 1) * self.BIN_WIDTH}": count
+                for i, count in enumerate(self.histogram)
+            }
+        }
+
+
+class RunSummary:
+    """
+    Constant-memory summary of a batch run
+
+    Tracks status counts, rejection reasons and confidence histograms, both
+    overall and per status, so rejected documents are not hidden behind the
+    accepted ones. Results without a confidence are counted under
+    `missing` instead. Reasons are normalized (per-document numbers
+    stripped) and capped at `max_reasons` distinct values so memory stays
+    bounded on huge runs.
+    """
+
+    def __init__(self, max_reasons: int = 100):
+        self.max_reasons = max_reasons
+        self.total = 0
+        self.status_counts: Counter = Counter()
+        self.reason_counts: Counter = Counter()
+        self.confidence = ConfidenceStats()
+        self.confidence_by_status: Dict[str, ConfidenceStats] = {}
+        self.missing_confidence: Counter = Counter()
+        self.started_at = time.time()
+
+    @staticmethod
+    def _normalize_reason(reason: str) -> str:
+        # "Low confidence in fields: name (72.1%)" -> "Low confidence in fields: name"
+        return re.sub(r'\s*\(\d+(?:\.\d+)?%\)', '', reason).strip()
+
+    def update(self, result: Dict):
+        self.total += 1
+        status = result.get("status", "unknown")
+        self.status_counts[status] += 1
+
+        if status in ("rejected", "error") and result.get("reason"):
+            reason = self._normalize_reason(str(result["reason"]))
+            if reason not in self.reason_counts and len(self.reason_counts) >= self.max_reasons:
+                reason = "other"
+            self.reason_counts[reason] += 1
+
+        confidence = result.get("confidence")
+        if isinstance(confidence, (int, float)):
+            self.confidence.add(confidence)
+            self.confidence_by_status.setdefault(status, ConfidenceStats()).add(confidence)
+        else:
+            self.missing_confidence[status] += 1
+
+    def to_dict(self) -> Dict:
+        return {
+            "total": self.total,
+            "elapsed_seconds": time.time() - self.started_at,
+            "status_counts": dict(self.status_counts),
+            "rejection_reasons": dict(self.reason_counts.most_common()),
+            "confidence": {
+                **self.confidence.to_dict(),
+                "by_status": {status: stats.to_dict() for status, stats in self.confidence_by_status.items()},
+                "missing": dict(self.missing_confidence)
+            }
+        }
+
+
+class JSONLResultsSink:
+    """
+    Streams batch results to a JSON Lines file as they complete
+
+    Each result is written as one line, so nothing accumulates in memory.
+    Output is gzip-compressed when `compress` is set or the path ends in
+    `.gz`, and the file is fsynced every `fsync_every` records. The run
+    summary is written next to the results on close.
+    """
+
+    def __init__(self, path: str, compress: Optional[bool] = None, fsync_every: int = 1000,
+                 summary_path: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.compress = path.endswith(".gz") if compress is None else compress
+        self.fsync_every = fsync_every
+        self.summary_path = summary_path or re.sub(r'(\.jsonl)?(\.gz)?$', '', path) + ".summary.json"
+        self.summary = RunSummary()
+        self._pending = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._raw = open(path, "wb")
+        self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb") if self.compress else self._raw
+
+    def write(self, result: Dict, document_path: Optional[str] = None):
+        """Append one result and fold it into the summary"""
+        record = {"document_path": document_path, **result} if document_path else result
+        self._stream.write(_dumps(record))
+        self.summary.update(result)
+        self._pending += 1
+        if self.fsync_every and self._pending >= self.fsync_every:
+            self.sync()
+
+    def sync(self):
+        """Flush buffered output and fsync it to disk"""
+        self._stream.flush()
+        if self._stream is not self._raw:
+            self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._pending = 0
+
+    def close(self):
+        if self._raw.closed:
+            return
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        with open(self.summary_path, "w") as f:
+            json.dump(self.summary.to_dict(), f, indent=2)
+        self.logger.info(f"Wrote {self.summary.total} results to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,21 +1,29 @@
 import pytesseract
 from PIL import Image
 import logging
-from typing import Dict, Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple, Iterator
 import re
+from bisect import bisect_left, bisect_right
 from ..agents.learning_manager import LearningManager
+from ..config.settings import Settings
+from .spatial_index import WordGrid, union_box
+
+def word_box(word: Dict) -> Tuple[int, int, int, int]:
+    """Bounding box of an OCR word as (left, top, width, height)"""
+    return (word['left'], word['top'], word['width'], word['height'])
 
 class OCRProcessor:
-    def __init__(self):
+    def __init__(self, learning_manager: Optional[LearningManager] = None):
         self.logger = logging.getLogger(__name__)
-        self.learning_manager = LearningManager()
+        self.learning_manager = learning_manager or LearningManager()
 
-    def extract_text(self, image_path: str) -> Dict:
+    def extract_text(self, image_path: str, document_type: str = "driver_license") -> Dict:
         """
         Extract text from an image using OCR with detailed feedback
         
         Args:
             image_path: Path to the image file
+            document_type: Selects the Tesseract profile for the full-page pass
             
         Returns:
             Dictionary containing extracted text, confidence scores, and detailed word data
@@ -24,54 +32,22 @@ class OCRProcessor:
             # Open the image
             image = Image.open(image_path)
             
-            # Get detailed OCR data
-            data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-            
-            # Process word-level confidence scores and text
-            words = []
-            total_conf = 0
-            valid_word_count = 0
-            
-            for i in range(len(data['text'])):
-                if data['conf'][i] > 0:  # Only consider words with confidence > 0
-                    word = data['text'][i].strip()
-                    if word:  # Only include non-empty words
-                        words.append({
-                            'text': word,
-                            'confidence': data['conf'][i],
-                            'block_num': data['block_num'][i],
-                            'line_num': data['line_num'][i],
-                            'word_num': data['word_num'][i]
-                        })
-                        total_conf += data['conf'][i]
-                        valid_word_count += 1
-            
-            # Calculate average confidence
-            avg_confidence = total_conf / valid_word_count if valid_word_count > 0 else 0
-            
-            # Group words by line for better readability
-            lines = {}
-            for word in words:
-                line_key = f"block_{word['block_num']}_line_{word['line_num']}"
-                if line_key not in lines:
-                    lines[line_key] = []
-                lines[line_key].append(word)
-            
-            # Sort words within each line
-            for line in lines.values():
-                line.sort(key=lambda x: x['word_num'])
+            lang, config = Settings.get_tesseract_config(
+                Settings.OCR_DOCUMENT_PROFILES.get(document_type, 'default')
+            )
+            words, lines, avg_confidence = self._ocr_words(image, lang, config)
             
             # Extract key fields with their confidences
-            fields = self._extract_key_fields(lines)
+            fields = self._extract_key_fields(lines, words, image)
             
             return {
-                "text": pytesseract.image_to_string(image),
+                "text": pytesseract.image_to_string(image, lang=lang, config=config),
                 "confidence": avg_confidence,
                 "status": "success",
                 "details": {
                     "words": words,
                     "lines": lines,
-                    "total_words": valid_word_count,
+                    "total_words": len(words),
                     "word_confidences": [w['confidence'] for w in words],
                     "fields": fields
                 }
@@ -86,10 +62,148 @@ class OCRProcessor:
                 "error": str(e)
             }
     
-    def _extract_key_fields(self, lines: Dict) -> Dict[str, Dict[str, float]]:
-        """Extract key fields with their confidences"""
-        fields = {}
+    def extract_words(self, image_path: str, document_type: str = "driver_license") -> Dict:
+        """
+        Run only the word-level OCR pass, leaving field extraction to the caller
+        
+        Unlike extract_text this skips the second full-page pass for plain text
+        and does not extract any fields; pair it with iter_key_fields, passing
+        the same image so low-confidence fields can be re-read.
+        
+        Returns:
+            Dictionary with status, average confidence, words and lines
+        """
+        try:
+            image = Image.open(image_path)
+            lang, config = Settings.get_tesseract_config(
+                Settings.OCR_DOCUMENT_PROFILES.get(document_type, 'default')
+            )
+            words, lines, avg_confidence = self._ocr_words(image, lang, config)
+            return {
+                "status": "success",
+                "confidence": avg_confidence,
+                "words": words,
+                "lines": lines
+            }
+        except Exception as e:
+            self.logger.error(f"OCR extraction failed: {str(e)}")
+            return {
+                "status": "error",
+                "confidence": None,
+                "error": str(e)
+            }
+    
+    def _ocr_words(self, image, lang: str, config: str) -> Tuple[List[Dict], Dict[str, List[Dict]], float]:
+        """Run image_to_data and return words, words grouped by line, and average confidence"""
+        # Get detailed OCR data
+        data = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+        
+        # Process word-level confidence scores and text
+        words = []
+        total_conf = 0
+        
+        for i in range(len(data['text'])):
+            if data['conf'][i] > 0:  # Only consider words with confidence > 0
+                word = data['text'][i].strip()
+                if word:  # Only include non-empty words
+                    words.append({
+                        'text': word,
+                        'confidence': data['conf'][i],
+                        'block_num': data['block_num'][i],
+                        'line_num': data['line_num'][i],
+                        'word_num': data['word_num'][i],
+                        'left': data['left'][i],
+                        'top': data['top'][i],
+                        'width': data['width'][i],
+                        'height': data['height'][i]
+                    })
+                    total_conf += data['conf'][i]
+        
+        # Calculate average confidence
+        avg_confidence = total_conf / len(words) if words else 0
+        
+        # Group words by line for better readability
+        lines = {}
+        for word in words:
+            line_key = f"block_{word['block_num']}_line_{word['line_num']}"
+            if line_key not in lines:
+                lines[line_key] = []
+            lines[line_key].append(word)
+        
+        # Sort words within each line
+        for line in lines.values():
+            line.sort(key=lambda x: x['word_num'])
+        
+        return words, lines, avg_confidence
+    
+    def extract_field(self, image, field: str, box: Optional[Tuple[int, int, int, int]] = None) -> Dict[str, float]:
+        """
+        OCR a single field region with the field's Tesseract profile
+        
+        The profile's single-line segmentation and character whitelist make
+        this much cheaper than a full-page pass, and the result needs no
+        pattern matching to isolate the value.
+        
+        Args:
+            image: Path to the image file or an opened PIL image
+            field: Field name, used to pick the OCR profile
+            box: Optional (left, top, right, bottom) region to crop to
+            
+        Returns:
+            Dictionary with the field value and its average word confidence
+        """
+        try:
+            if isinstance(image, str):
+                image = Image.open(image)
+            if box:
+                image = image.crop(box)
+            lang, config = Settings.get_tesseract_config(field)
+            data = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+            
+            words = [
+                (data['text'][i].strip(), float(data['conf'][i]))
+                for i in range(len(data['text']))
+                if float(data['conf'][i]) > 0 and data['text'][i].strip()
+            ]
+            if not words:
+                return {"value": "", "confidence": 0.0}
+            return {
+                "value": " ".join(text for text, _ in words),
+                "confidence": sum(conf for _, conf in words) / len(words)
+            }
+        except Exception as e:
+            self.logger.error(f"OCR extraction failed for field {field}: {str(e)}")
+            return {"value": "", "confidence": 0.0}
+    
+    def _extract_key_fields(self, lines: Dict, words: Optional[List[Dict]] = None,
+                            image=None) -> Dict[str, Dict[str, float]]:
+        """
+        Extract key fields with their confidences
         
+        Args:
+            lines: Words grouped by OCR line
+            words: All words with their bounding boxes; enables label-anchored lookups
+            image: Source image (path or PIL image); enables field re-reads
+        """
+        return dict(self.iter_key_fields(lines, words, image=image))
+    
+    def iter_key_fields(self, lines: Dict, words: Optional[List[Dict]] = None,
+                        order: Optional[List[str]] = None,
+                        image=None) -> Iterator[Tuple[str, Dict[str, float]]]:
+        """
+        Extract key fields one at a time, yielding (field, result) pairs
+        
+        Each field's patterns only run when the caller asks for the next
+        field, so a consumer that has reached a decision can stop early.
+        
+        Args:
+            lines: Words grouped by OCR line
+            words: All words with their bounding boxes; enables label-anchored lookups
+            order: Fields to extract and their order (default: all fields)
+            image: Source image (path or PIL image). When given, a match below its
+                field's confidence threshold is re-read from its word boxes with
+                the field's own Tesseract profile.
+        """
         # Common header/boilerplate text to exclude
         HEADER_TEXTS = [
             "UNION OF INDIA",
@@ -111,34 +225,89 @@ class OCRProcessor:
             """Check if text is common header/boilerplate text"""
             return any(header.lower() in text.lower() for header in HEADER_TEXTS)
         
-        def find_in_lines(patterns: List[str], preprocess_func=None, min_word_confidence=0, exclude_headers=True, max_words=None, field_name=None) -> Dict[str, float]:
+        def join_words(line_words: List[Dict]) -> Tuple[str, List[int]]:
+            """Join words with single spaces, keeping each word's start offset"""
+            starts = []
+            offset = 0
+            for word in line_words:
+                starts.append(offset)
+                offset += len(word["text"]) + 1
+            return " ".join(w["text"] for w in line_words), starts
+        
+        def words_in_span(line_words: List[Dict], starts: List[int], start: int, end: int) -> List[Dict]:
+            """Words overlapping the character span [start, end), found by bisection"""
+            first = max(bisect_right(starts, start) - 1, 0)
+            last = bisect_left(starts, end)
+            return line_words[first:last]
+        
+        # Spatial index over word boxes, built on first use when the OCR pass kept geometry
+        spatial = {}
+        
+        def get_grid() -> Optional[WordGrid]:
+            if "grid" not in spatial:
+                has_geometry = words and all("left" in w for w in words)
+                spatial["grid"] = WordGrid([word_box(w) for w in words]) if has_geometry else None
+            return spatial["grid"]
+        
+        def span_box(line_words: List[Dict], starts: List[int], start: int, end: int) -> Optional[Tuple[int, int, int, int]]:
+            """
+            (left, top, right, bottom) of the character span [start, end) of a line
+            
+            Words only partly inside the span (e.g. a value fused with its label)
+            are cut in proportion to their characters.
+            """
+            first = max(bisect_right(starts, start) - 1, 0)
+            last = bisect_left(starts, end)
+            span_words = line_words[first:last]
+            if not span_words or not all("left" in w for w in span_words):
+                return None
+            left, top, width, height = union_box([word_box(w) for w in span_words])
+            head, tail = span_words[0], span_words[-1]
+            head_cut = max(start - starts[first], 0) / max(len(head["text"]), 1)
+            tail_cut = max(starts[last - 1] + len(tail["text"]) - end, 0) / max(len(tail["text"]), 1)
+            return (int(head["left"] + head["width"] * head_cut), top,
+                    int(tail["left"] + tail["width"] * (1 - tail_cut)), top + height)
+        
+        def find_in_lines(patterns: List[str], preprocess_func=None, min_word_confidence=0, exclude_headers=True, max_words=None, field_name=None, value_pattern=None) -> Dict[str, float]:
             """Find text matching any of the given patterns with confidence threshold"""
             best_match = {"value": "", "confidence": 0.0}
             best_pattern = None
+            best_box = None
+            # Values each pattern matched in this document
+            pattern_values: Dict[str, set] = {}
+            
+            # Filter and join each line once; every pattern reuses the result
+            candidate_lines = []
+            for line_words in lines.values():
+                # Filter out low confidence words if threshold is set
+                if min_word_confidence > 0:
+                    line_words = [w for w in line_words if w["confidence"] >= min_word_confidence]
+                
+                if not line_words:
+                    continue
+                
+                # If max_words is set, skip lines that are too long (likely addresses or headers)
+                if max_words and len(line_words) > max_words:
+                    continue
+                
+                raw_text, starts = join_words(line_words)
+                if exclude_headers and is_header_text(raw_text):
+                    continue
+                
+                line_text = preprocess_func(raw_text) if preprocess_func else raw_text
+                candidate_lines.append((line_words, raw_text, starts, line_text))
+            
+            # Try the best-performing patterns first and skip ones that are chronically
+            # wrong. Every remaining pattern still runs: a loose pattern can match a
+            # prefix of the value with high confidence, so order only breaks ties.
+            if field_name:
+                patterns = self.learning_manager.order_patterns(field_name, patterns)
             for pattern in patterns:
-                for line_words in lines.values():
-                    # Filter out low confidence words if threshold is set
-                    if min_word_confidence > 0:
-                        line_words = [w for w in line_words if w["confidence"] >= min_word_confidence]
-                    
-                    if not line_words:
-                        continue
-                    
-                    # If max_words is set, skip lines that are too long (likely addresses or headers)
-                    if max_words and len(line_words) > max_words:
-                        continue
-                        
-                    line_text = " ".join(w["text"] for w in line_words)
-                    if exclude_headers and is_header_text(line_text):
-                        continue
-                        
-                    if preprocess_func:
-                        line_text = preprocess_func(line_text)
-                    
+                for line_words, raw_text, starts, line_text in candidate_lines:
                     matches = re.search(pattern, line_text, re.IGNORECASE)
                     if matches:
-                        matched_text = matches.group(1) if len(matches.groups()) > 0 else matches.group(0)
-                        matched_text = matched_text.strip()
+                        group = 1 if len(matches.groups()) > 0 else 0
+                        matched_text = matches.group(group).strip()
                         
                         # Skip if the matched text is a header
                         if exclude_headers and is_header_text(matched_text):
@@ -148,113 +317,196 @@ class OCRProcessor:
                         if any(word.lower() in matched_text.lower() for word in ["street", "road", "nagar", "colony", "peth", "stand", "district", "dist", "tal"]):
                             continue
                         
-                        # Find words that make up the matched text
-                        matched_words = []
-                        for word in line_words:
-                            if (word["text"] in matched_text.split() or 
-                                matched_text in word["text"] or 
-                                any(part in matched_text for part in word["text"].split())):
-                                matched_words.append(word)
+                        # Map the match back to the words it covers
+                        if preprocess_func:
+                            span_start = raw_text.lower().find(matched_text.lower())
+                        else:
+                            span_start = matches.start(group) + len(matches.group(group)) - len(matches.group(group).lstrip())
+                        matched_words = words_in_span(line_words, starts, span_start, span_start + len(matched_text)) if span_start >= 0 else []
                         if matched_words:
+                            pattern_values.setdefault(pattern, set()).add(matched_text)
                             confidence = sum(w["confidence"] for w in matched_words) / len(matched_words)
-                            # Update best match if confidence is higher
-                            if confidence > best_match["confidence"]:
+                            # Update best match if confidence is higher, or equal with a longer value
+                            if (confidence > best_match["confidence"] or
+                                    (confidence == best_match["confidence"] and len(matched_text) > len(best_match["value"]))):
                                 best_match = {"value": matched_text, "confidence": confidence}
                                 best_pattern = pattern
-            # Record the successful pattern if found
+                                best_box = span_box(line_words, starts, span_start, span_start + len(matched_text))
+            # Record the winning pattern, and count a failure only for patterns whose
+            # match was wrong. A pattern that did not match at all may simply cover
+            # another document layout, so it is not penalised.
             if field_name and best_match["value"] and best_pattern:
                 self.learning_manager.record_success(field_name, best_pattern)
+                for pattern, values in pattern_values.items():
+                    if pattern != best_pattern and best_match["value"] not in values:
+                        self.learning_manager.record_failure(field_name, pattern)
+            return reread_field(field_name, best_match, best_box, value_pattern)
+        
+        def reread_field(field_name: Optional[str], match: Dict[str, float],
+                         box: Optional[Tuple[int, int, int, int]], value_pattern: Optional[str]) -> Dict[str, float]:
+            """
+            Re-OCR a low-confidence match from its box with the field's profile
+            
+            The re-read only replaces the match if the whole text matches the
+            field's value pattern and reads with higher confidence.
+            """
+            threshold = Settings.FIELD_CONFIDENCE_THRESHOLDS.get(field_name)
+            if (image is None or threshold is None or value_pattern is None or box is None
+                    or not match["value"] or match["confidence"] >= threshold):
+                return match
+            left, top, right, bottom = box
+            # Pad the crop so Tesseract does not clip glyph edges
+            pad = max((bottom - top) // 4, 2)
+            reread = self.extract_field(image, field_name, box=(max(left - pad, 0), max(top - pad, 0),
+                                                                right + pad, bottom + pad))
+            if (reread["confidence"] > match["confidence"]
+                    and re.fullmatch(value_pattern, reread["value"], re.IGNORECASE)):
+                return reread
+            return match
+        
+        def find_near_label(label_patterns: List[str], value_pattern: str) -> Dict[str, float]:
+            """
+            Find a value to the right of, or just below, a label using word geometry
+            
+            Catches values Tesseract split into a different line or block than their label.
+            """
+            best_match = {"value": "", "confidence": 0.0}
+            grid = get_grid()
+            if grid is None:
+                return best_match
+            for line_words in lines.values():
+                raw_text, starts = join_words(line_words)
+                for label_pattern in label_patterns:
+                    label = re.search(label_pattern, raw_text, re.IGNORECASE)
+                    if not label:
+                        continue
+                    label_words = words_in_span(line_words, starts, label.start(), label.end())
+                    label_box = union_box([word_box(w) for w in label_words])
+                    for neighbours in (grid.right_of(label_box), grid.below(label_box)):
+                        neighbour_words = [words[i] for i in neighbours]
+                        if not neighbour_words:
+                            continue
+                        text, neighbour_starts = join_words(neighbour_words)
+                        value = re.search(value_pattern, text, re.IGNORECASE)
+                        if not value:
+                            continue
+                        matched_words = words_in_span(neighbour_words, neighbour_starts, value.start(1), value.end(1))
+                        confidence = sum(w["confidence"] for w in matched_words) / len(matched_words)
+                        if confidence > best_match["confidence"]:
+                            best_match = {"value": value.group(1).strip(), "confidence": confidence}
+                        break
             return best_match
         
-        # License number patterns
-        license_patterns = [
-            r'(?:DL|License)\s*(?:No\.?|Number:?)[:\s-]*([A-Z0-9\s-]+)(?:\s+DO[!}])?',
-            r'(?:MH|KA|DL)\d{2}\s*\d{8,12}',
-            r'(?:MH|KA|DL)\d{2}\s*\d{4,8}[A-Z]?',  # Format for some Indian licenses
-        ]
-        fields["license_number"] = find_in_lines(license_patterns, field_name="license_number")
+        def extract_license_number() -> Dict[str, float]:
+            # License number patterns
+            license_patterns = [
+                r'(?:DL|License)\s*(?:No\.?|Number:?)[:\s-]*([A-Z0-9\s-]+)(?:\s+DO[!}])?',
+                r'(?:MH|KA|DL)\d{2}\s*\d{8,12}',
+                r'(?:MH|KA|DL)\d{2}\s*\d{4,8}[A-Z]?',  # Format for some Indian licenses
+            ]
+            value_pattern = r'((?:[A-Z]{2}[-\s]?\d{2})[\s-]*\d{4,12})'
+            result = find_in_lines(license_patterns, field_name="license_number", value_pattern=value_pattern)
+            if not result["value"]:
+                result = find_near_label([r'(?:DL|License)\s*(?:No\.?|Number:?)'], value_pattern)
+            return result
         
-        # Enhanced name detection for driver's licenses
-        def clean_name(text):
-            """Clean and normalize name text from license"""
-            # Remove common prefixes and noise
-            text = re.sub(r'^(?:Name\s*[-:.]|\s*Us\s+|\s*S/W\s+of\s+|\s*[SW]/[ODW]\s+)', '', text, flags=re.IGNORECASE)
-            # Remove text after common separators
-            text = re.sub(r'\s+(?:S/O|D/O|W/O|S/|D/|W/|of|SO|DO|WO)\s+.*$', '', text, flags=re.IGNORECASE)
-            # Remove common metadata markers
-            text = re.sub(r'\s*(?:DOB|BG|ADD?|PIN|Age).*$', '', text, flags=re.IGNORECASE)
-            # Remove location-specific words
-            text = re.sub(r'\s*(?:STREET|ROAD|NAGAR|COLONY|PETH|STAND|DISTRICT|DIST|TAL|VILLAGE|VLG).*$', '', text, flags=re.IGNORECASE)
-            return text.strip()
+        def extract_name() -> Dict[str, float]:
+            # Enhanced name detection for driver's licenses
+            def clean_name(text):
+                """Clean and normalize name text from license"""
+                # Remove common prefixes and noise
+                text = re.sub(r'^(?:Name\s*[-:.]|\s*Us\s+|\s*S/W\s+of\s+|\s*[SW]/[ODW]\s+)', '', text, flags=re.IGNORECASE)
+                # Remove text after common separators
+                text = re.sub(r'\s+(?:S/O|D/O|W/O|S/|D/|W/|of|SO|DO|WO)\s+.*$', '', text, flags=re.IGNORECASE)
+                # Remove common metadata markers
+                text = re.sub(r'\s*(?:DOB|BG|ADD?|PIN|Age).*$', '', text, flags=re.IGNORECASE)
+                # Remove location-specific words
+                text = re.sub(r'\s*(?:STREET|ROAD|NAGAR|COLONY|PETH|STAND|DISTRICT|DIST|TAL|VILLAGE|VLG).*$', '', text, flags=re.IGNORECASE)
+                return text.strip()
 
-        # Enhanced name patterns for Indian driver's licenses
-        name_patterns = [
-            # Primary name patterns with known prefixes
-            r'(?:Name\s*[-:.]|\bUs\b|\bS/W\s+of\b)\s*[-:]?\s*([A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z]+)+)',
-            
-            # Name with relation prefix patterns
-            r'(?:^|\s)([A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z]+)+)\s*(?:S/O|D/O|W/O|S/|D/|W/|of|SO|DO|WO)',
-            
-            # Strict all-caps name pattern (2-3 words)
-            r'\b([A-Z]+\s+[A-Z]+(?:\s+[A-Z]+)?)\b(?:\s*(?:S/O|D/O|W/O|of))?',
+            # Enhanced name patterns for Indian driver's licenses
+            name_patterns = [
+                # Primary name patterns with known prefixes
+                r'(?:Name\s*[-:.]|\bUs\b|\bS/W\s+of\b)\s*[-:]?\s*([A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z]+)+)',
+                
+                # Name with relation prefix patterns
+                r'(?:^|\s)([A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z]+)+)\s*(?:S/O|D/O|W/O|S/|D/|W/|of|SO|DO|WO)',
+                
+                # Strict all-caps name pattern (2-3 words)
+                r'\b([A-Z]+\s+[A-Z]+(?:\s+[A-Z]+)?)\b(?:\s*(?:S/O|D/O|W/O|of))?',
+                
+                # Mixed case name pattern
+                r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,2})\b',
+                
+                # Name after common Indian prefixes
+                r'(?:Sri|Shri|Smt|Mr|Mrs|Ms)\s+([A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z]+)+)',
+            ]
             
-            # Mixed case name pattern
-            r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,2})\b',
-            
-            # Name after common Indian prefixes
-            r'(?:Sri|Shri|Smt|Mr|Mrs|Ms)\s+([A-Z][A-Za-z]+(?:\s+[A-Z][A-Za-z]+)+)',
-        ]
-        
-        # Use stricter parameters for name detection
-        name_result = find_in_lines(
-            patterns=name_patterns,
-            preprocess_func=clean_name,
-            min_word_confidence=75.0,  # Slightly lower threshold to catch more candidates
-            max_words=4,  # Names typically won't be more than 4 words
-            exclude_headers=True,
-            field_name="name"
-        )
+            # Use stricter parameters for name detection
+            name_result = find_in_lines(
+                patterns=name_patterns,
+                preprocess_func=clean_name,
+                min_word_confidence=75.0,  # Slightly lower threshold to catch more candidates
+                max_words=4,  # Names typically won't be more than 4 words
+                exclude_headers=True,
+                field_name="name",
+                value_pattern=r'[A-Za-z]+(?:\s+[A-Za-z]+)+'
+            )
 
-        # Post-process name to ensure proper capitalization
-        if name_result["value"]:
-            # Properly capitalize each part of the name
-            name_parts = name_result["value"].split()
-            name_result["value"] = " ".join(part.title() for part in name_parts)
+            # Post-process name to ensure proper capitalization
+            if name_result["value"]:
+                # Properly capitalize each part of the name
+                name_parts = name_result["value"].split()
+                name_result["value"] = " ".join(part.title() for part in name_parts)
 
-        fields["name"] = name_result
-        
-        # Expiry date patterns
-        date_patterns = [
-            r'Valid\s+Till[.:\s;]*(\d{2}[-/]\d{2}[-/]\d{4})',
-            r'Valid\s+Until[.:\s;]*(\d{2}[-/]\d{2}[-/]\d{4})',
-            r'Expiry[.:\s;]*(\d{2}[-/]\d{2}[-/]\d{4})',
-        ]
-        fields["expiry_date"] = find_in_lines(date_patterns, field_name="expiry_date")
-        
-        # License class patterns
-        def clean_class(text):
-            # Remove noise and standardize format
-            text = text.upper().strip()
-            text = re.sub(r'[^A-Z0-9\s]', '', text)
-            return text
-        
-        # Specific patterns for Indian driving license classes
-        class_patterns = [
-            r'\b(?:MCWG|LMV|MC|TRANS)\b',  # Common Indian license classes
-            r'(?:Class|COV)[.:\s]*([A-Z]+(?:\s*[A-Z0-9]*)*)',
-            r'\b(?:MCWG|LMV)[-\s]*(?:\d{2}[-/]\d{2}[-/]\d{4})?',  # Class with optional date
-        ]
+            return name_result
         
-        # Get all potential classes
-        class_result = find_in_lines(class_patterns, clean_class, min_word_confidence=70.0, exclude_headers=False, field_name="license_class")
+        def extract_expiry_date() -> Dict[str, float]:
+            # Expiry date patterns
+            date_patterns = [
+                r'Valid\s+Till[.:\s;]*(\d{2}[-/]\d{2}[-/]\d{4})',
+                r'Valid\s+Until[.:\s;]*(\d{2}[-/]\d{2}[-/]\d{4})',
+                r'Expiry[.:\s;]*(\d{2}[-/]\d{2}[-/]\d{4})',
+            ]
+            value_pattern = r'(\d{2}[-/]\d{2}[-/]\d{4})'
+            result = find_in_lines(date_patterns, field_name="expiry_date", value_pattern=value_pattern)
+            if not result["value"]:
+                result = find_near_label([r'Valid\s+Till', r'Valid\s+Until', r'Expiry'], value_pattern)
+            return result
         
-        # Clean up the class result
-        if class_result["value"]:
-            # Extract just the class part if there's a date
-            class_match = re.match(r'^(MCWG|LMV|MC|TRANS)', class_result["value"])
-            if class_match:
-                class_result["value"] = class_match.group(1)
-        
-        fields["license_class"] = class_result
+        def extract_license_class() -> Dict[str, float]:
+            # License class patterns
+            def clean_class(text):
+                # Remove noise and standardize format
+                text = text.upper().strip()
+                text = re.sub(r'[^A-Z0-9\s]', '', text)
+                return text
+            
+            # Specific patterns for Indian driving license classes
+            class_patterns = [
+                r'\b(?:MCWG|LMV|MC|TRANS)\b',  # Common Indian license classes
+                r'(?:Class|COV)[.:\s]*([A-Z]+(?:\s*[A-Z0-9]*)*)',
+                r'\b(?:MCWG|LMV)[-\s]*(?:\d{2}[-/]\d{2}[-/]\d{4})?',  # Class with optional date
+            ]
+            
+            # Get all potential classes
+            class_result = find_in_lines(class_patterns, clean_class, min_word_confidence=70.0, exclude_headers=False, field_name="license_class",
+                                         value_pattern=r'(?:MCWG|LMV|MC|TRANS)(?:\s+(?:MCWG|LMV|MC|TRANS))*')
+            
+            # Clean up the class result
+            if class_result["value"]:
+                # Extract just the class part if there's a date
+                class_match = re.match(r'^(MCWG|LMV|MC|TRANS)', class_result["value"])
+                if class_match:
+                    class_result["value"] = class_match.group(1)
+            
+            return class_result
         
-        return fields
\ No newline at end of file
+        extractors = {
+            "license_number": extract_license_number,
+            "name": extract_name,
+            "expiry_date": extract_expiry_date,
+            "license_class": extract_license_class
+        }
+        for field in (order or extractors):
+            yield field, extractors[field]()
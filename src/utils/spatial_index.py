@@ -0,0 +1,79 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Box layout used throughout: (left, top, width, height)
+Box = Tuple[int, int, int, int]
+
+
+def union_box(boxes: Sequence[Box]) -> Box:
+    """Smallest box covering all given boxes"""
+    left = min(b[0] for b in boxes)
+    top = min(b[1] for b in boxes)
+    right = max(b[0] + b[2] for b in boxes)
+    bottom = max(b[1] + b[3] for b in boxes)
+    return (left, top, right - left, bottom - top)
+
+
+class WordGrid:
+    """
+    Uniform grid index over word bounding boxes
+
+    Boxes are kept in one compact int32 array and bucketed into square cells
+    sized from the median word height, so a region query only visits the
+    cells it overlaps instead of every word on the page.
+    """
+
+    def __init__(self, boxes: Sequence[Box], cell_size: Optional[int] = None):
+        self.boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        self.rights = self.boxes[:, 0] + self.boxes[:, 2]
+        self.bottoms = self.boxes[:, 1] + self.boxes[:, 3]
+        if cell_size is None:
+            median_height = int(np.median(self.boxes[:, 3])) if len(self.boxes) else 1
+            cell_size = max(1, 2 * median_height)
+        self.cell_size = cell_size
+
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        for i, (left, top, right, bottom) in enumerate(zip(self.boxes[:, 0], self.boxes[:, 1], self.rights, self.bottoms)):
+            for cx in range(left // cell_size, right // cell_size + 1):
+                for cy in range(top // cell_size, bottom // cell_size + 1):
+                    self.cells.setdefault((cx, cy), []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def query(self, left: int, top: int, right: int, bottom: int) -> np.ndarray:
+        """Indices of boxes intersecting the rectangle, in reading order"""
+        size = self.cell_size
+        candidates = set()
+        for cx in range(max(left, 0) // size, max(right, 0) // size + 1):
+            for cy in range(max(top, 0) // size, max(bottom, 0) // size + 1):
+                candidates.update(self.cells.get((cx, cy), ()))
+        if not candidates:
+            return np.empty(0, dtype=np.int64)
+        idx = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        boxes = self.boxes[idx]
+        hit = ((boxes[:, 0] <= right) & (self.rights[idx] >= left) &
+               (boxes[:, 1] <= bottom) & (self.bottoms[idx] >= top))
+        idx = idx[hit]
+        return idx[np.lexsort((self.boxes[idx, 0], self.boxes[idx, 1]))]
+
+    def right_of(self, box: Box, max_distance: Optional[int] = None) -> np.ndarray:
+        """
+        Indices of words on the same row to the right of box, nearest first
+
+        A word is on the same row when its vertical centre falls inside the box's
+        vertical extent.
+        """
+        left, top, width, height = box
+        max_distance = max_distance if max_distance is not None else 15 * height
+        idx = self.query(left + width, top, left + width + max_distance, top + height)
+        centres = self.boxes[idx, 1] + self.boxes[idx, 3] // 2
+        idx = idx[(self.boxes[idx, 0] >= left + width - height // 2) & (centres >= top) & (centres <= top + height)]
+        return idx[np.argsort(self.boxes[idx, 0], kind="stable")]
+
+    def below(self, box: Box, max_distance: Optional[int] = None) -> np.ndarray:
+        """Indices of words just below box that overlap it horizontally, in reading order"""
+        left, top, width, height = box
+        max_distance = max_distance if max_distance is not None else 2 * height
+        idx = self.query(left, top + height, left + width, top + height + max_distance)
+        return idx[self.boxes[idx, 1] >= top + height // 2]
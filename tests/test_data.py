@@ -2,8 +2,11 @@ from PIL import Image, ImageDraw, ImageFont
 import os
 from datetime import datetime, timedelta
 import random
+import shutil
 import string
 
+from src.agents.learning_manager import LearningManager
+
 class TestDataGenerator:
     def __init__(self, output_dir: str = "test_data"):
         self.output_dir = output_dir
@@ -61,4 +64,33 @@ class TestDataGenerator:
 
     def generate_invalid_class_license(self) -> str:
         """Generate a license with invalid class"""
-        return self.generate_license_image(license_class='X')
\ No newline at end of file
+        return self.generate_license_image(license_class='X')
+
+def make_lines(*lines):
+    """Build the line dict produced by extract_text from (text, confidence) rows"""
+    result = {}
+    for line_num, (text, confidence) in enumerate(lines):
+        result[f"block_1_line_{line_num}"] = [
+            {"text": word, "confidence": confidence, "block_num": 1, "line_num": line_num, "word_num": i}
+            for i, word in enumerate(text.split())
+        ]
+    return result
+
+def make_ocr_words(*lines):
+    """Build an extract_words result from (text, confidence) rows"""
+    result = make_lines(*lines)
+    words = [word for line_words in result.values() for word in line_words]
+    return {"status": "success", "confidence": 90.0, "words": words, "lines": result}
+
+def make_learning_manager(test_case, model_dir: str = "test_models") -> LearningManager:
+    """Learning manager backed by a throwaway model file, removed when the test ends"""
+    manager = LearningManager(os.path.join(model_dir, "learning_patterns.json"))
+
+    def cleanup():
+        # Flush first so a later exit flush does not recreate the directory
+        manager.flush()
+        if os.path.exists(model_dir):
+            shutil.rmtree(model_dir)
+
+    test_case.addCleanup(cleanup)
+    return manager
@@ -0,0 +1,170 @@
+import unittest
+import os
+import random
+import time
+import shutil
+import sqlite3
+from datetime import datetime, timedelta
+
+from src.storage.driver_registry import (
+    DriverRegistry,
+    SymmetricDeleteIndex,
+    edit_distance,
+    normalize_license_number,
+    normalize_name,
+)
+from src.agents.license_verifier import LicenseVerifier
+
+RECORDS = [
+    {"license_number": "MH12 20110012345", "name": "Yash Sharma"},
+    {"license_number": "KA05 20150098765", "name": "Priya Nair"},
+    {"license_number": "DL01 20190054321", "name": "Rahul Verma"},
+]
+
+class TestNormalization(unittest.TestCase):
+    def test_license_confusions_share_a_key(self):
+        self.assertEqual(
+            normalize_license_number("MH12 2O11OO12345"),
+            normalize_license_number("mh12-20110012345")
+        )
+        self.assertEqual(normalize_license_number("I1l"), "111")
+
+    def test_name_drops_spacing_and_digit_confusions(self):
+        self.assertEqual(normalize_name("Y4sh  5harma"), normalize_name("Y4SH SHARMA"))
+        self.assertEqual(normalize_name("R0hit"), "ROHIT")
+
+    def test_edit_distance_is_bounded(self):
+        self.assertEqual(edit_distance("ABCD", "ABDC", 2), 1)
+        self.assertEqual(edit_distance("ABCD", "ABCD", 0), 0)
+        self.assertEqual(edit_distance("ABCD", "WXYZ", 2), 3)
+
+class TestDriverRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = DriverRegistry()
+        self.registry.add_records(RECORDS)
+
+    def test_lookup_license_tolerates_ocr_noise(self):
+        matches = self.registry.lookup_license("MH1220110O12345")
+        self.assertEqual(matches[0]["record"]["name"], "Yash Sharma")
+        self.assertEqual(matches[0]["distance"], 0)
+
+        # A dropped digit is within the edit distance
+        matches = self.registry.lookup_license("MH12 2011001234")
+        self.assertEqual(matches[0]["record"]["name"], "Yash Sharma")
+        self.assertEqual(matches[0]["distance"], 1)
+
+    def test_lookup_name(self):
+        matches = self.registry.lookup_name("PRlYA NAlR")
+        self.assertEqual(matches[0]["record"]["license_number"], "KA05 20150098765")
+
+    def test_verify(self):
+        self.assertEqual(self.registry.verify("DL01 20190054321", "Rahul Varma")["status"], "matched")
+        self.assertEqual(self.registry.verify("DL01 20190054321", "Priya Nair")["status"], "name_mismatch")
+        self.assertEqual(self.registry.verify("GJ01 20190054321", "Rahul Verma")["status"], "not_found")
+        # Verification never queries names on their own, so the name index is not built
+        self.assertIsNone(self.registry._name_index)
+
+    def test_name_index_covers_records_added_later(self):
+        self.registry.lookup_name("Yash Sharma")
+        self.registry.add_records([{"license_number": "GJ01 20200011111", "name": "Anil Kumar"}])
+
+        self.assertEqual(self.registry.lookup_name("Anil Kumr")[0]["record"]["license_number"], "GJ01 20200011111")
+
+class TestSymmetricDeleteIndex(unittest.TestCase):
+    def test_finds_keys_within_distance(self):
+        index = SymmetricDeleteIndex(max_distance=2, prefix_length=6)
+        index.add_many([("ABCDEFGH", 0), ("ABCXYZ", 1), ("A", 2), ("ABCDEFGH", 3)])
+
+        self.assertEqual(index.lookup("ABDCEFGH"), [{"key": "ABCDEFGH", "distance": 1, "record_ids": [0, 3]}])
+        self.assertEqual([m["key"] for m in index.lookup("AB")], ["A"])
+        self.assertEqual(index.lookup("ZZZZ"), [])
+
+    def test_rejects_keys_outside_the_alphabet(self):
+        with self.assertRaises(ValueError):
+            SymmetricDeleteIndex().add("ab-1", 0)
+
+    def test_scales_to_large_registries(self):
+        random.seed(7)
+        records = [
+            {"license_number": f"{random.choice(['MH', 'KA', 'DL'])}{random.randint(1, 99):02d} "
+                               f"{random.randint(2000, 2024)}{random.randint(0, 9999999):07d}",
+             "name": "Test Driver"}
+            for _ in range(100000)
+        ]
+        registry = DriverRegistry()
+
+        start = time.perf_counter()
+        registry.add_records(records)
+        registry.lookup_license(records[0]["license_number"])
+        build_seconds = time.perf_counter() - start
+
+        index = registry.license_index
+        # Variants are stored as packed codes plus key ids: 12 bytes each, no strings
+        self.assertEqual((index.variant_codes.nbytes + index.variant_key_ids.nbytes) // len(index.variant_codes), 12)
+        self.assertLess(len(index.variant_codes), 14 * len(records))
+        self.assertLess(build_seconds, 10)
+
+        queries = [record["license_number"].replace("0", "O", 1) for record in records[:1000]]
+        start = time.perf_counter()
+        for query, record in zip(queries, records):
+            self.assertIs(registry.lookup_license(query)[0]["record"], record)
+        self.assertLess((time.perf_counter() - start) / len(queries), 0.002)
+
+class TestRegistryLoading(unittest.TestCase):
+    def setUp(self):
+        self.test_registry_dir = "test_registry"
+        os.makedirs(self.test_registry_dir, exist_ok=True)
+
+    def tearDown(self):
+        if os.path.exists(self.test_registry_dir):
+            shutil.rmtree(self.test_registry_dir)
+
+    def test_load_csv(self):
+        path = os.path.join(self.test_registry_dir, "drivers.csv")
+        with open(path, "w") as f:
+            f.write("license_number,name\n")
+            for record in RECORDS:
+                f.write(f"{record['license_number']},{record['name']}\n")
+
+        registry = DriverRegistry.load(path)
+
+        self.assertEqual(len(registry), 3)
+        self.assertEqual(registry.verify("KA05 2015OO98765", "Priya Nair")["status"], "matched")
+
+    def test_load_sqlite(self):
+        path = os.path.join(self.test_registry_dir, "drivers.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE drivers (license_number TEXT, name TEXT)")
+        conn.executemany("INSERT INTO drivers VALUES (:license_number, :name)", RECORDS)
+        conn.commit()
+        conn.close()
+
+        registry = DriverRegistry.load(path)
+
+        self.assertEqual(len(registry), 3)
+        self.assertEqual(registry.lookup_license("MH1220110012345")[0]["record"]["name"], "Yash Sharma")
+
+class TestLicenseVerifierRegistry(unittest.TestCase):
+    def setUp(self):
+        registry = DriverRegistry()
+        registry.add_records(RECORDS)
+        self.verifier = LicenseVerifier(registry=registry)
+        self.expiry = (datetime.now() + timedelta(days=365)).strftime("%d-%m-%Y")
+
+    def test_registered_driver_passes(self):
+        result = self.verifier._validate_license_info({
+            "license_number": "MH12 2O110012345",
+            "name": "Yash Sharma",
+            "expiry_date": self.expiry
+        })
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["registry_match"]["status"], "matched")
+
+    def test_unknown_license_rejected(self):
+        result = self.verifier._validate_license_info({
+            "license_number": "GJ01 20190054321",
+            "name": "Yash Sharma",
+            "expiry_date": self.expiry
+        })
+        self.assertEqual(result["status"], "rejected")
+        self.assertIn("registry", result["reason"].lower())
@@ -0,0 +1,180 @@
+import unittest
+from unittest.mock import Mock
+import os
+import shutil
+
+from src.storage.job_queue import FileSpoolJobQueue, JobQueue, SQLiteJobQueue
+from src.agents.queue_worker import QueueWorker
+from src.agents.document_manager import DocumentManagerAgent
+
+class JobQueueTests:
+    """Behaviour every JobQueue implementation must share"""
+
+    def make_queue(self) -> JobQueue:
+        raise NotImplementedError
+
+    def setUp(self):
+        self.test_queue_dir = "test_queue"
+        self.queue = self.make_queue()
+
+    def tearDown(self):
+        self.queue.close()
+        if os.path.exists(self.test_queue_dir):
+            shutil.rmtree(self.test_queue_dir)
+
+    def test_leased_job_is_invisible_to_other_workers(self):
+        self.queue.enqueue("license.jpg")
+
+        first = self.queue.lease("worker-1")
+        second = self.queue.lease("worker-2")
+
+        self.assertEqual(len(first), 1)
+        self.assertEqual(second, [])
+        self.assertEqual(first[0]["attempts"], 1)
+
+    def test_expired_lease_is_handed_out_again(self):
+        self.queue.visibility_timeout = 0
+        self.queue.enqueue("license.jpg")
+
+        first = self.queue.lease("worker-1")
+        second = self.queue.lease("worker-2")
+
+        self.assertEqual(second[0]["id"], first[0]["id"])
+        self.assertEqual(second[0]["attempts"], 2)
+        # The stale lease can no longer fail the job
+        self.assertEqual(self.queue.fail(first[0], "timeout"), "lost")
+
+    def test_retry_then_dead_letter(self):
+        job_id = self.queue.enqueue("license.jpg")
+
+        job = self.queue.lease("worker-1")[0]
+        self.assertEqual(self.queue.fail(job, "boom"), "queued")
+        job = self.queue.lease("worker-1")[0]
+        self.assertEqual(self.queue.fail(job, "boom again"), "dead")
+
+        self.assertEqual(self.queue.lease("worker-1"), [])
+        dead = self.queue.dead_letters()
+        self.assertEqual(dead[0]["id"], job_id)
+        self.assertEqual(dead[0]["last_error"], "boom again")
+
+    def test_backoff_delays_retry(self):
+        self.queue.backoff_base = 60
+        self.queue.backoff_max = 60
+        self.queue.enqueue("license.jpg")
+
+        job = self.queue.lease("worker-1")[0]
+        self.queue.fail(job, "boom")
+
+        self.assertEqual(self.queue.lease("worker-1"), [])
+
+    def test_result_writes_are_idempotent(self):
+        self.queue.visibility_timeout = 0
+        job_id = self.queue.enqueue("license.jpg")
+        first = self.queue.lease("worker-1")[0]
+        second = self.queue.lease("worker-2")[0]
+
+        self.assertTrue(self.queue.complete(second, {"status": "pending_review"}))
+        self.assertFalse(self.queue.complete(first, {"status": "rejected"}))
+
+        self.assertEqual(self.queue.get_result(job_id), {"status": "pending_review"})
+        self.assertEqual(self.queue.stats(), {"done": 1})
+
+    def test_interface_is_abstract(self):
+        with self.assertRaises(TypeError):
+            JobQueue()
+
+    def test_enqueue_with_same_id_is_noop(self):
+        self.queue.enqueue("license.jpg", job_id="doc-1")
+        self.queue.enqueue("license.jpg", job_id="doc-1")
+
+        self.assertEqual(self.queue.stats(), {"queued": 1})
+
+    def test_requeue_dead(self):
+        self.queue.max_attempts = 1
+        job_id = self.queue.enqueue("license.jpg")
+        self.queue.fail(self.queue.lease("worker-1")[0], "boom")
+
+        self.assertTrue(self.queue.requeue_dead(job_id))
+        self.assertFalse(self.queue.requeue_dead(job_id))
+        self.assertEqual(self.queue.lease("worker-1")[0]["attempts"], 1)
+
+    def test_extend_lease(self):
+        self.queue.visibility_timeout = 0
+        self.queue.enqueue("license.jpg")
+        job = self.queue.lease("worker-1")[0]
+
+        self.assertTrue(self.queue.extend_lease(job, 60))
+        self.assertEqual(self.queue.lease("worker-2"), [])
+
+class TestSQLiteJobQueue(JobQueueTests, unittest.TestCase):
+    def make_queue(self):
+        return SQLiteJobQueue(
+            os.path.join(self.test_queue_dir, "jobs.db"),
+            visibility_timeout=30,
+            max_attempts=2,
+            backoff_base=0,
+            backoff_max=0
+        )
+
+class TestFileSpoolJobQueue(JobQueueTests, unittest.TestCase):
+    def make_queue(self):
+        return FileSpoolJobQueue(
+            os.path.join(self.test_queue_dir, "spool"),
+            visibility_timeout=30,
+            max_attempts=2,
+            backoff_base=0,
+            backoff_max=0
+        )
+
+    def test_separate_instances_share_the_spool(self):
+        # Each node opens its own queue over the shared directory
+        other = self.make_queue()
+        job_id = self.queue.enqueue("license.jpg")
+
+        job = other.lease("node-2")[0]
+        self.assertEqual(self.queue.lease("node-1"), [])
+        other.complete(job, {"status": "pending_review"})
+
+        self.assertEqual(self.queue.get_result(job_id), {"status": "pending_review"})
+        self.assertEqual(os.listdir(os.path.join(self.test_queue_dir, "spool", "tmp")), [])
+
+class TestQueueWorker(unittest.TestCase):
+    def setUp(self):
+        self.test_queue_dir = "test_queue"
+        self.queue = SQLiteJobQueue(os.path.join(self.test_queue_dir, "jobs.db"), max_attempts=1)
+        self.manager = Mock()
+
+    def tearDown(self):
+        self.queue.close()
+        if os.path.exists(self.test_queue_dir):
+            shutil.rmtree(self.test_queue_dir)
+
+    def test_worker_stores_results(self):
+        self.manager.process_document.return_value = {"status": "rejected", "reason": "License is expired"}
+        job_id = self.queue.enqueue("license.jpg")
+
+        worker = QueueWorker(self.queue, self.manager, worker_id="worker-1")
+        processed = worker.run(stop_when_empty=True)
+
+        self.assertEqual(processed, 1)
+        self.manager.process_document.assert_called_once_with("license.jpg", "driver_license")
+        self.assertEqual(self.queue.get_result(job_id)["reason"], "License is expired")
+
+    def test_worker_fails_jobs_on_error(self):
+        self.manager.process_document.return_value = {"status": "error", "reason": "cannot open file"}
+        job_id = self.queue.enqueue("license.jpg")
+
+        QueueWorker(self.queue, self.manager, worker_id="worker-1").run(stop_when_empty=True)
+
+        self.assertIsNone(self.queue.get_result(job_id))
+        self.assertEqual(self.queue.stats(), {"dead": 1})
+
+    def test_worker_retries_ocr_failures_with_real_manager(self):
+        job_id = self.queue.enqueue(os.path.join(self.test_queue_dir, "missing.jpg"))
+
+        QueueWorker(self.queue, DocumentManagerAgent(), worker_id="worker-1").run(stop_when_empty=True)
+
+        self.assertIsNone(self.queue.get_result(job_id))
+        dead = self.queue.dead_letters()
+        self.assertEqual(dead[0]["id"], job_id)
+        self.assertIn("missing.jpg", dead[0]["last_error"])
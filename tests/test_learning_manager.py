@@ -0,0 +1,118 @@
+import unittest
+from unittest.mock import patch
+import json
+import os
+import gc
+import shutil
+
+from src.agents.learning_manager import LearningManager, _flush_all, _managers
+
+class TestLearningManager(unittest.TestCase):
+    def setUp(self):
+        self.test_model_dir = "test_models"
+        self.model_path = os.path.join(self.test_model_dir, "learning_patterns.json")
+        self.manager = LearningManager(self.model_path, half_life_days=1, snapshot_every=1000)
+
+    def tearDown(self):
+        self.manager.flush()
+        if os.path.exists(self.test_model_dir):
+            shutil.rmtree(self.test_model_dir)
+
+    def test_top_patterns_follow_success_rate(self):
+        for _ in range(3):
+            self.manager.record_success("name", "p1")
+        self.manager.record_failure("name", "p1")
+        self.manager.record_success("name", "p2")
+        self.manager.record_failure("name", "p3")
+
+        self.assertEqual(self.manager.get_top_patterns("name"), ["p2", "p1", "p3"])
+        self.assertEqual(self.manager.get_top_patterns("name", top_n=1), ["p2"])
+        self.assertEqual(self.manager.get_top_patterns("unknown"), [])
+
+    def test_scores_decay_with_half_life(self):
+        self.manager.record_success("name", "p1")
+        now = self.manager._epoch
+        with patch("src.agents.learning_manager.time.time", return_value=now + 86400):
+            self.assertAlmostEqual(self.manager.get_score("name", "p1")["success"], 0.5)
+            # A fresh update outweighs the decayed one
+            self.manager.record_failure("name", "p1")
+            score = self.manager.get_score("name", "p1")
+        self.assertAlmostEqual(score["success"], 0.5)
+        self.assertAlmostEqual(score["failure"], 1.0)
+
+    def test_order_patterns_prunes_failing_patterns(self):
+        self.manager.prune_min_evidence = 5
+        for _ in range(10):
+            self.manager.record_success("expiry_date", "good")
+            self.manager.record_failure("expiry_date", "bad")
+
+        ordered = self.manager.order_patterns("expiry_date", ["bad", "new", "good"])
+
+        self.assertEqual(ordered, ["good", "new"])
+        # Never prune every candidate
+        self.assertEqual(self.manager.order_patterns("expiry_date", ["bad"]), ["bad"])
+
+    def test_order_patterns_reads_maintained_ranking(self):
+        self.manager.record_success("name", "p1")
+        self.manager.record_feedback("name", "p2", correct=False)
+
+        with patch("src.agents.learning_manager.sorted", side_effect=AssertionError("re-sorted"), create=True):
+            self.assertEqual(self.manager.order_patterns("name", ["p2", "new", "p1"]), ["p1", "new", "p2"])
+
+    def test_snapshot_round_trip(self):
+        self.manager.record_success("name", "p1")
+        self.manager.record_feedback("name", "p2", correct=False)
+        self.manager.flush()
+
+        with open(self.model_path) as f:
+            self.assertEqual(json.load(f)["version"], 2)
+        reloaded = LearningManager(self.model_path, half_life_days=1)
+
+        self.assertEqual(reloaded.get_top_patterns("name"), ["p1", "p2"])
+        self.assertAlmostEqual(reloaded.get_score("name", "p2")["failure"], 1.0, places=3)
+
+    def test_workers_sharing_a_model_merge_their_updates(self):
+        other = LearningManager(self.model_path, half_life_days=1, snapshot_every=1000)
+        self.manager.record_success("name", "p1")
+        other.record_success("name", "p2")
+        other.record_success("name", "p2")
+
+        self.manager.flush()
+        other.flush()
+        # A second save only adds what changed since the first
+        self.manager.record_success("name", "p1")
+        self.manager.flush()
+
+        reloaded = LearningManager(self.model_path, half_life_days=1)
+        self.assertAlmostEqual(reloaded.get_score("name", "p1")["success"], 2.0, places=3)
+        self.assertAlmostEqual(reloaded.get_score("name", "p2")["success"], 2.0, places=3)
+        # Saving also picks up the other worker's evidence
+        self.assertAlmostEqual(self.manager.get_score("name", "p2")["success"], 2.0, places=3)
+
+    def test_snapshot_every_n_updates(self):
+        self.manager.snapshot_every = 2
+        self.manager.record_success("name", "p1")
+        self.assertFalse(os.path.exists(self.model_path))
+        self.manager.record_success("name", "p1")
+        self.assertTrue(os.path.exists(self.model_path))
+
+    def test_loads_legacy_counters(self):
+        os.makedirs(self.test_model_dir, exist_ok=True)
+        with open(self.model_path, "w") as f:
+            json.dump({"license_class": {"a": 2, "b": 12}}, f)
+
+        manager = LearningManager(self.model_path)
+
+        self.assertEqual(manager.get_top_patterns("license_class"), ["b", "a"])
+        self.assertAlmostEqual(manager.get_score("license_class", "b")["success"], 12.0, places=3)
+
+    def test_exit_hook_flushes_live_managers(self):
+        self.manager.record_success("name", "p1")
+        _flush_all()
+        self.assertTrue(os.path.exists(self.model_path))
+
+        # The hook holds managers weakly, so dropped managers are not kept alive
+        count = len(_managers)
+        LearningManager(os.path.join(self.test_model_dir, "other.json"))
+        gc.collect()
+        self.assertEqual(len(_managers), count)
@@ -6,7 +6,7 @@ from datetime import datetime, timedelta
 
 from src.agents.license_verifier import LicenseVerifier
 from src.config.settings import Settings
-from test_data import TestDataGenerator
+from test_data import TestDataGenerator, make_learning_manager, make_ocr_words
 
 class TestLicenseVerifier(unittest.TestCase):
     def setUp(self):
@@ -90,4 +90,83 @@ class TestLicenseVerifier(unittest.TestCase):
         
         self.assertEqual(result["status"], "rejected")
         self.assertIn("missing required fields", result["reason"].lower())
-        self.assertIn("name", result["reason"].lower())
\ No newline at end of file
+        self.assertIn("name", result["reason"].lower())
+
+    @patch('src.utils.ocr_processor.OCRProcessor.extract_text')
+    def test_rejection_carries_ocr_confidence(self, mock_extract):
+        past_date = (datetime.now() - timedelta(days=30)).strftime("%d-%m-%Y")
+        mock_extract.return_value = {
+            "status": "success",
+            "confidence": 88.0,
+            "details": {"fields": {
+                "name": {"value": "Yash Sharma", "confidence": 95.0},
+                "license_number": {"value": "MH12 20110012345", "confidence": 92.0},
+                "expiry_date": {"value": past_date, "confidence": 90.0},
+            }}
+        }
+
+        result = self.verifier.verify_license("dummy_path.jpg", incremental=False)
+
+        self.assertEqual(result["status"], "rejected")
+        self.assertEqual(result["confidence"], 88.0)
+
+class TestIncrementalVerification(unittest.TestCase):
+    def setUp(self):
+        self.verifier = LicenseVerifier()
+        self.verifier.ocr.learning_manager = make_learning_manager(self)
+        self.future_date = (datetime.now() + timedelta(days=365)).strftime("%d-%m-%Y")
+
+    @patch('src.utils.ocr_processor.OCRProcessor.extract_words')
+    def test_expired_license_stops_early(self, mock_words):
+        past_date = (datetime.now() - timedelta(days=30)).strftime("%d-%m-%Y")
+        mock_words.return_value = make_ocr_words(
+            ("Name : YASH SHARMA", 95.0),
+            ("MH12 20110012345", 92.0),
+            (f"Valid Till {past_date}", 90.0),
+        )
+
+        result = self.verifier.verify_license("dummy_path.jpg", incremental=True)
+
+        self.assertEqual(result["status"], "rejected")
+        self.assertIn("expired", result["reason"].lower())
+        self.assertEqual(result["skipped_fields"], ["license_class", "license_number", "name"])
+        self.assertEqual(result["confidence"], 90.0)
+
+    @patch('src.utils.ocr_processor.OCRProcessor.extract_words')
+    def test_disallowed_class_stops_early(self, mock_words):
+        mock_words.return_value = make_ocr_words(
+            ("COV TRANS", 90.0),
+            (f"Valid Till {self.future_date}", 90.0),
+        )
+
+        result = self.verifier.verify_license("dummy_path.jpg", incremental=True)
+
+        self.assertEqual(result["status"], "rejected")
+        self.assertIn("not acceptable", result["reason"].lower())
+        self.assertEqual(result["skipped_fields"], ["license_number", "name"])
+
+    @patch('src.utils.ocr_processor.OCRProcessor.extract_words')
+    def test_valid_license_checks_every_field(self, mock_words):
+        mock_words.return_value = make_ocr_words(
+            ("Name : YASH SHARMA", 95.0),
+            ("MH12 20110012345", 92.0),
+            ("COV LMV", 80.0),
+            (f"Valid Till {self.future_date}", 90.0),
+        )
+
+        result = self.verifier.verify_license("dummy_path.jpg", incremental=True)
+
+        self.assertEqual(result["status"], "pending_review")
+        self.assertEqual(result["extracted_info"]["name"], "Yash Sharma")
+        self.assertEqual(result["extracted_info"]["license_number"], "MH12 20110012345")
+        self.assertEqual(result["extracted_info"]["license_class"], "LMV")
+        self.assertEqual(result["confidence"], 90.0)
+
+    @patch('src.utils.ocr_processor.OCRProcessor.extract_words')
+    def test_ocr_failure(self, mock_words):
+        mock_words.return_value = {"status": "error", "confidence": None, "error": "cannot open file"}
+
+        result = self.verifier.verify_license("dummy_path.jpg", incremental=True)
+
+        self.assertEqual(result["status"], "rejected")
+        self.assertEqual(result["error"], "cannot open file")
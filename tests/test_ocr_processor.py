@@ -0,0 +1,189 @@
+import unittest
+from unittest.mock import patch
+import json
+import re
+from PIL import Image
+
+from src.utils.ocr_processor import OCRProcessor
+from src.config.settings import Settings
+from test_data import make_learning_manager, make_lines
+
+class TestOCRProfiles(unittest.TestCase):
+    def test_field_profile_overrides_default(self):
+        profile = Settings.get_ocr_profile("expiry_date")
+
+        self.assertEqual(profile["psm"], 7)
+        self.assertEqual(profile["lang"], Settings.OCR_PROFILES["default"]["lang"])
+        self.assertEqual(Settings.get_ocr_profile("unknown"), Settings.OCR_PROFILES["default"])
+
+    def test_tesseract_config(self):
+        lang, config = Settings.get_tesseract_config("expiry_date")
+
+        self.assertEqual(lang, "eng")
+        self.assertIn("--psm 7", config)
+        self.assertIn("tessedit_char_whitelist=0123456789-/", config)
+        self.assertIn("load_system_dawg=0", config)
+        self.assertNotIn("whitelist", Settings.get_tesseract_config("driver_license")[1])
+
+    def test_tesseract_config_is_cached(self):
+        self.assertIs(Settings.get_tesseract_config("name"), Settings.get_tesseract_config("name"))
+
+class TestExtractField(unittest.TestCase):
+    def setUp(self):
+        self.ocr = OCRProcessor()
+        self.image = Image.new("RGB", (400, 200), color="white")
+
+    @patch("src.utils.ocr_processor.pytesseract.image_to_data")
+    def test_extract_field_uses_field_profile(self, mock_data):
+        mock_data.return_value = {"text": ["", "12-08-2031"], "conf": [-1, 91.0]}
+
+        result = self.ocr.extract_field(self.image, "expiry_date", box=(10, 10, 200, 40))
+
+        self.assertEqual(result, {"value": "12-08-2031", "confidence": 91.0})
+        lang, config = Settings.get_tesseract_config("expiry_date")
+        self.assertEqual(mock_data.call_args.kwargs["config"], config)
+        self.assertEqual(mock_data.call_args.args[0].size, (190, 30))
+
+    @patch("src.utils.ocr_processor.pytesseract.image_to_data")
+    def test_extract_field_without_text(self, mock_data):
+        mock_data.return_value = {"text": [""], "conf": [-1]}
+
+        self.assertEqual(self.ocr.extract_field(self.image, "name"), {"value": "", "confidence": 0.0})
+
+class TestFieldReread(unittest.TestCase):
+    def setUp(self):
+        self.learning_manager = make_learning_manager(self)
+        self.ocr = OCRProcessor(learning_manager=self.learning_manager)
+        self.image = Image.new("RGB", (400, 200), color="white")
+        self.lines = {"block_1_line_1": [
+            {"text": "Valid", "confidence": 90.0, "block_num": 1, "line_num": 1, "word_num": 1,
+             "left": 10, "top": 10, "width": 50, "height": 20},
+            {"text": "Till", "confidence": 90.0, "block_num": 1, "line_num": 1, "word_num": 2,
+             "left": 65, "top": 10, "width": 40, "height": 20},
+            {"text": "12-08-2031", "confidence": 60.0, "block_num": 1, "line_num": 1, "word_num": 3,
+             "left": 120, "top": 12, "width": 120, "height": 20},
+        ]}
+
+    @patch("src.utils.ocr_processor.pytesseract.image_to_data")
+    def test_low_confidence_match_is_reread_with_field_profile(self, mock_data):
+        mock_data.return_value = {"text": ["12-08-2031"], "conf": [93.0]}
+
+        fields = self.ocr._extract_key_fields(self.lines, self.lines["block_1_line_1"], self.image)
+
+        self.assertEqual(fields["expiry_date"], {"value": "12-08-2031", "confidence": 93.0})
+        self.assertEqual(mock_data.call_args.kwargs["config"], Settings.get_tesseract_config("expiry_date")[1])
+        # Only the value's box (plus padding) is cropped, not the label
+        self.assertEqual(mock_data.call_args.args[0].size, (130, 30))
+
+    @patch("src.utils.ocr_processor.pytesseract.image_to_data")
+    def test_reread_must_match_value_pattern(self, mock_data):
+        # The date is fused with its label into one word; the re-read picks up label noise
+        self.lines["block_1_line_1"][1:] = [
+            {"text": "Till:12-08-2031", "confidence": 60.0, "block_num": 1, "line_num": 1, "word_num": 2,
+             "left": 65, "top": 10, "width": 150, "height": 20},
+        ]
+        mock_data.return_value = {"text": ["7111-12-08-2031"], "conf": [95.0]}
+
+        fields = self.ocr._extract_key_fields(self.lines, self.lines["block_1_line_1"], self.image)
+
+        self.assertEqual(fields["expiry_date"], {"value": "12-08-2031", "confidence": 60.0})
+        # Only the date's share of the fused word is cropped: chars 5-15 of 15, plus padding
+        self.assertEqual(mock_data.call_args.args[0].size, (110, 30))
+
+    @patch("src.utils.ocr_processor.pytesseract.image_to_data")
+    def test_reread_is_skipped_without_image_or_when_confident(self, mock_data):
+        self.ocr._extract_key_fields(self.lines, self.lines["block_1_line_1"])
+        self.lines["block_1_line_1"][2]["confidence"] = 88.0
+        fields = self.ocr._extract_key_fields(self.lines, self.lines["block_1_line_1"], self.image)
+
+        self.assertEqual(fields["expiry_date"]["confidence"], 88.0)
+        self.assertFalse(any(call.kwargs["config"] == Settings.get_tesseract_config("expiry_date")[1]
+                             for call in mock_data.call_args_list))
+
+class TestLearnedPatternOrder(unittest.TestCase):
+    def setUp(self):
+        self.learning_manager = make_learning_manager(self)
+        self.ocr = OCRProcessor(learning_manager=self.learning_manager)
+        self.lines = make_lines(
+            ("DL No MH12 20110012345", 92.0),
+            ("Valid Till 12-08-2031", 90.0),
+        )
+
+    def test_extraction_records_winning_pattern(self):
+        fields = self.ocr._extract_key_fields(self.lines)
+
+        self.assertEqual(fields["expiry_date"]["value"], "12-08-2031")
+        self.assertEqual(self.learning_manager.get_top_patterns("expiry_date", 1),
+                         [r'Valid\s+Till[.:\s;]*(\d{2}[-/]\d{2}[-/]\d{4})'])
+
+    def test_all_patterns_run_in_learned_order(self):
+        self.ocr._extract_key_fields(self.lines)
+        with patch("src.utils.ocr_processor.re.search", wraps=re.search) as search:
+            self.ocr._extract_key_fields(make_lines(("Valid Till 12-08-2031", 90.0)))
+
+        tried = [call.args[0] for call in search.call_args_list if "Valid" in call.args[0] or "Expiry" in call.args[0]]
+        # The learned best pattern is tried first, but a confident match does not end the search
+        self.assertEqual(tried[0], r'Valid\s+Till[.:\s;]*(\d{2}[-/]\d{2}[-/]\d{4})')
+        self.assertEqual(len(tried), 3)
+
+    def test_legacy_counters_do_not_truncate_license_number(self):
+        # The shipped counters rank the loose 4-8 digit pattern above the full-length one
+        with open("models/learning_patterns.json") as f:
+            self.learning_manager.load_state(json.load(f))
+
+        fields = self.ocr._extract_key_fields(make_lines(("MH12 20110012345", 92.0)))
+
+        self.assertEqual(fields["license_number"]["value"], "MH12 20110012345")
+
+    def test_patterns_for_other_layouts_are_not_pruned(self):
+        self.learning_manager.prune_min_evidence = 5
+        for _ in range(40):
+            self.ocr._extract_key_fields(self.lines)
+
+        # A layout the learned pattern does not cover still extracts, even without geometry
+        fields = self.ocr._extract_key_fields(make_lines(("Expiry: 12-08-2031", 90.0)))
+
+        self.assertEqual(fields["expiry_date"]["value"], "12-08-2031")
+
+    def test_wrong_matches_count_as_failures(self):
+        loose = r'(?:MH|KA|DL)\d{2}\s*\d{4,8}[A-Z]?'
+        self.ocr._extract_key_fields(make_lines(("MH12 20110012345", 92.0)))
+
+        # The loose pattern matched a truncated number, so it was wrong on this document
+        self.assertEqual(self.learning_manager.get_score("license_number", loose)["success"], 0.0)
+        self.assertAlmostEqual(self.learning_manager.get_score("license_number", loose)["failure"], 1.0, places=3)
+        self.assertEqual(self.learning_manager.get_score("expiry_date", r'Expiry[.:\s;]*(\d{2}[-/]\d{2}[-/]\d{4})'),
+                         {"success": 0.0, "failure": 0.0})
+
+class TestSpatialFieldExtraction(unittest.TestCase):
+    def setUp(self):
+        self.learning_manager = make_learning_manager(self)
+        self.ocr = OCRProcessor(learning_manager=self.learning_manager)
+
+    def test_value_split_from_label_is_found_by_geometry(self):
+        # Tesseract put the date in its own block to the right of its label
+        words = [
+            {"text": "Valid", "confidence": 90.0, "block_num": 1, "line_num": 1, "word_num": 1,
+             "left": 10, "top": 10, "width": 50, "height": 20},
+            {"text": "Till", "confidence": 90.0, "block_num": 1, "line_num": 1, "word_num": 2,
+             "left": 65, "top": 10, "width": 40, "height": 20},
+            {"text": "12-08-2031", "confidence": 88.0, "block_num": 2, "line_num": 1, "word_num": 1,
+             "left": 300, "top": 12, "width": 120, "height": 20},
+        ]
+        lines = {
+            "block_1_line_1": words[:2],
+            "block_2_line_1": words[2:],
+        }
+
+        fields = self.ocr._extract_key_fields(lines, words)
+
+        self.assertEqual(fields["expiry_date"], {"value": "12-08-2031", "confidence": 88.0})
+
+    def test_match_maps_to_covering_words(self):
+        lines = make_lines(("Valid Till 12-08-2031", 90.0))
+        lines["block_1_line_0"][2]["confidence"] = 80.0
+
+        fields = self.ocr._extract_key_fields(lines)
+
+        # Only the date word counts toward the confidence, not the label
+        self.assertEqual(fields["expiry_date"]["confidence"], 80.0)
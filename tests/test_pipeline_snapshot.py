@@ -0,0 +1,101 @@
+import unittest
+from unittest.mock import patch
+import os
+import shutil
+
+from src.storage.pipeline_snapshot import PipelineSnapshot, attach_snapshot, build_snapshot
+from src.storage.driver_registry import DriverRegistry
+from src.agents.learning_manager import LearningManager
+from src.config.settings import Settings
+
+class TestPipelineSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.test_snapshot_dir = "test_snapshot"
+        self.snapshot_path = os.path.join(self.test_snapshot_dir, "pipeline.snapshot")
+        self.model_path = os.path.join(self.test_snapshot_dir, "learning_patterns.json")
+        self.learning_manager = LearningManager(self.model_path, snapshot_every=1000)
+        self.learning_manager.record_success("expiry_date", "p1")
+        self.learning_manager.record_failure("expiry_date", "p2")
+        self.registry = DriverRegistry()
+        self.registry.add_records([{"license_number": "MH12 20110012345", "name": "Yash Sharma"}])
+        attach_snapshot.cache_clear()
+
+    def tearDown(self):
+        attach_snapshot.cache_clear()
+        self.learning_manager.flush()
+        if os.path.exists(self.test_snapshot_dir):
+            shutil.rmtree(self.test_snapshot_dir)
+
+    def test_round_trip(self):
+        build_snapshot(self.snapshot_path, self.learning_manager, self.registry)
+        snapshot = PipelineSnapshot(self.snapshot_path)
+
+        self.assertTrue(snapshot.is_compatible())
+        self.assertEqual(snapshot.ocr_configs()["expiry_date"], Settings.get_tesseract_config("expiry_date"))
+        self.assertEqual(snapshot.registry().verify("MH12 2O110012345", "Yash Sharma")["status"], "matched")
+        self.assertIsNone(snapshot.learning_state("models/other.json"))
+        self.assertIn("expiry_date", snapshot.learning_state(self.model_path)["fields"])
+        snapshot.close()
+
+    def test_sections_decode_lazily(self):
+        build_snapshot(self.snapshot_path, self.learning_manager, self.registry)
+        snapshot = PipelineSnapshot(self.snapshot_path)
+
+        self.assertEqual(set(snapshot._decoded), {"meta"})
+        snapshot.load_all()
+        self.assertEqual(set(snapshot._decoded), {"meta", "ocr_configs", "learning", "registry"})
+        snapshot.close()
+
+    def test_registry_is_queried_from_the_mapping(self):
+        self.registry.name_index
+        build_snapshot(self.snapshot_path, registry=self.registry)
+        snapshot = PipelineSnapshot(self.snapshot_path)
+        registry = snapshot.registry()
+
+        self.assertIn("license", snapshot._section("registry"))
+        for index in (registry.license_index, registry.name_index):
+            self.assertIs(index.variant_codes.base.obj, snapshot._map)
+            self.assertFalse(index.variant_codes.flags.writeable)
+        self.assertEqual(registry.lookup_name("Yash Sharma")[0]["record"]["license_number"], "MH12 20110012345")
+        with self.assertRaises(TypeError):
+            registry.add_records([{"license_number": "KA05 20150098765", "name": "Priya Nair"}])
+        del registry, index
+        snapshot.close()
+
+    def test_learning_manager_starts_from_snapshot(self):
+        build_snapshot(self.snapshot_path, self.learning_manager)
+
+        with patch.object(Settings, "PIPELINE_SNAPSHOT_PATH", self.snapshot_path):
+            manager = LearningManager(self.model_path)
+
+        self.assertEqual(manager.get_top_patterns("expiry_date"), ["p1", "p2"])
+
+    def test_incompatible_snapshot_is_ignored(self):
+        build_snapshot(self.snapshot_path, self.learning_manager)
+
+        with patch("src.storage.pipeline_snapshot.settings_fingerprint", return_value="changed"):
+            self.assertIsNone(attach_snapshot(self.snapshot_path))
+
+    def test_rejects_other_files(self):
+        os.makedirs(self.test_snapshot_dir, exist_ok=True)
+        with open(self.snapshot_path, "wb") as f:
+            f.write(b"not a snapshot" * 10)
+
+        with self.assertRaises(ValueError):
+            PipelineSnapshot(self.snapshot_path)
+        self.assertIsNone(attach_snapshot(self.snapshot_path))
+
+    def test_registry_ignored_after_source_changes(self):
+        registry_path = os.path.join(self.test_snapshot_dir, "drivers.csv")
+        os.makedirs(self.test_snapshot_dir, exist_ok=True)
+        with open(registry_path, "w") as f:
+            f.write("license_number,name\nMH12 20110012345,Yash Sharma\n")
+        build_snapshot(self.snapshot_path, registry=self.registry, registry_path=registry_path)
+        snapshot = PipelineSnapshot(self.snapshot_path)
+        self.assertIsNotNone(snapshot.registry())
+
+        with open(registry_path, "a") as f:
+            f.write("KA05 20150098765,Priya Nair\n")
+
+        self.assertIsNone(snapshot.registry())
+        snapshot.close()
@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import Mock
+import gzip
+import json
+import os
+import shutil
+
+from src.storage.results_sink import JSONLResultsSink, RunSummary
+from src.agents.document_manager import DocumentManagerAgent
+
+class TestRunSummary(unittest.TestCase):
+    def test_counts_reasons_and_confidence(self):
+        summary = RunSummary()
+        summary.update({"status": "pending_review", "confidence": 91.5})
+        summary.update({"status": "pending_review", "confidence": 87.0})
+        summary.update({"status": "rejected", "reason": "Low confidence in fields: name (72.1%)"})
+        summary.update({"status": "rejected", "reason": "Low confidence in fields: name (64.0%)"})
+
+        result = summary.to_dict()
+
+        self.assertEqual(result["total"], 4)
+        self.assertEqual(result["status_counts"], {"pending_review": 2, "rejected": 2})
+        self.assertEqual(result["rejection_reasons"], {"Low confidence in fields: name": 2})
+        self.assertEqual(result["confidence"]["histogram"]["80-90"], 1)
+        self.assertEqual(result["confidence"]["histogram"]["90-100"], 1)
+        self.assertAlmostEqual(result["confidence"]["mean"], 89.25)
+
+    def test_confidence_is_split_by_status(self):
+        summary = RunSummary()
+        summary.update({"status": "pending_review", "confidence": 91.5})
+        summary.update({"status": "rejected", "reason": "License is expired", "confidence": 42.0})
+        summary.update({"status": "rejected", "reason": "Failed to extract text from document"})
+
+        confidence = summary.to_dict()["confidence"]
+
+        self.assertEqual(confidence["count"], 2)
+        self.assertEqual(confidence["by_status"]["pending_review"]["histogram"]["90-100"], 1)
+        self.assertEqual(confidence["by_status"]["rejected"]["histogram"]["40-50"], 1)
+        self.assertAlmostEqual(confidence["by_status"]["rejected"]["mean"], 42.0)
+        self.assertEqual(confidence["missing"], {"rejected": 1})
+
+    def test_reasons_are_capped(self):
+        summary = RunSummary(max_reasons=2)
+        for i in range(5):
+            summary.update({"status": "rejected", "reason": f"License class X{i} not acceptable"})
+
+        self.assertEqual(len(summary.reason_counts), 3)
+        self.assertEqual(summary.reason_counts["other"], 3)
+
+class TestJSONLResultsSink(unittest.TestCase):
+    def setUp(self):
+        self.test_output_dir = "test_results"
+
+    def tearDown(self):
+        if os.path.exists(self.test_output_dir):
+            shutil.rmtree(self.test_output_dir)
+
+    def test_streams_one_line_per_result(self):
+        path = os.path.join(self.test_output_dir, "run.jsonl")
+        with JSONLResultsSink(path, fsync_every=1) as sink:
+            sink.write({"status": "rejected", "reason": "License is expired"}, "a.jpg")
+            sink.write({"status": "pending_review", "confidence": 90.0}, "b.jpg")
+
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["document_path"] for r in records], ["a.jpg", "b.jpg"])
+        with open(sink.summary_path) as f:
+            self.assertEqual(json.load(f)["status_counts"], {"rejected": 1, "pending_review": 1})
+        self.assertEqual(sink.summary_path, os.path.join(self.test_output_dir, "run.summary.json"))
+
+    def test_compressed_output(self):
+        path = os.path.join(self.test_output_dir, "run.jsonl.gz")
+        with JSONLResultsSink(path) as sink:
+            sink.write({"status": "error", "reason": "cannot open file"})
+
+        with gzip.open(path, "rt") as f:
+            self.assertEqual(json.loads(f.readline())["status"], "error")
+
+    def test_process_batch_streams_to_sink(self):
+        manager = DocumentManagerAgent()
+        manager.license_verifier = Mock()
+        manager.license_verifier.verify_license.return_value = {"status": "rejected", "reason": "License is expired"}
+
+        path = os.path.join(self.test_output_dir, "batch.jsonl")
+        with JSONLResultsSink(path) as sink:
+            summary = manager.process_batch(iter(["a.jpg", "b.jpg", "c.pdf"]), "driver_license", sink)
+
+        self.assertEqual(summary["total"], 3)
+        self.assertEqual(summary["rejection_reasons"], {"License is expired": 3})
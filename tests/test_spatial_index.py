@@ -0,0 +1,37 @@
+import unittest
+
+from src.utils.spatial_index import WordGrid, union_box
+
+# Two rows of words: "Valid Till | 12-08-2031" and "Name | Yash Sharma" below
+BOXES = [
+    (10, 10, 50, 20),   # 0 Valid
+    (65, 10, 40, 20),   # 1 Till
+    (300, 12, 120, 20), # 2 12-08-2031
+    (10, 60, 60, 20),   # 3 Name
+    (80, 60, 50, 20),   # 4 Yash
+    (140, 60, 80, 20),  # 5 Sharma
+]
+
+class TestWordGrid(unittest.TestCase):
+    def setUp(self):
+        self.grid = WordGrid(BOXES)
+
+    def test_query_returns_words_in_reading_order(self):
+        self.assertEqual(list(self.grid.query(0, 0, 200, 100)), [0, 1, 3, 4, 5])
+        self.assertEqual(list(self.grid.query(500, 500, 600, 600)), [])
+
+    def test_right_of_stays_on_row(self):
+        label = union_box([BOXES[0], BOXES[1]])
+
+        self.assertEqual(label, (10, 10, 95, 20))
+        self.assertEqual(list(self.grid.right_of(label)), [2])
+
+    def test_below(self):
+        self.assertEqual(list(self.grid.below(BOXES[0], max_distance=60)), [3])
+        self.assertEqual(list(self.grid.below(union_box(BOXES[:2]), max_distance=60)), [3, 4])
+        self.assertEqual(list(self.grid.below(BOXES[2])), [])
+
+    def test_empty_grid(self):
+        grid = WordGrid([])
+        self.assertEqual(len(grid), 0)
+        self.assertEqual(list(grid.query(0, 0, 10, 10)), [])